@@ -1,84 +1,743 @@
 """Expose the entrypoints."""
+import csv
+import json
+import sys
+import time
 import click
-import numpy as np
 from greentea.log import LogConfiguration
-from greentea.text import Texts
-from .theme import Themes
+from torch.utils.data import DataLoader
+from .theme import Theme, Themes
 from .news import DataPointSources
-from .dataset import Dataset
+from .dataset import Dataset, PairCollator, BudgetBatchSampler
 from .downloader import Initializer
+from .archive import DocumentPack
+from .dedup import Deduplicator
+from .normalizer import MessageNormalizer
+from .index import SimilarDocumentIndex
+from .tokens import TokenizedCorpus, CorpusTfidfVectorizer, TokenIdEncoder
+from .classifier import \
+    MlpClassifier, \
+    EmbeddingBagClassifier, \
+    PreTrainedTextVecMlpClassifier
+from .pipeline import \
+    Corpus, \
+    Pipeline, \
+    create_sparsevec_fingerprint, \
+    create_featuresel_fingerprint, \
+    create_train_fingerprint, \
+    create_update_fingerprint
+from .cache import ArtifactCache, run_cached
+from .checkpoint import Checkpointer
+from .profiling import PROFILER
+from .sweep import Sweep, SweepConfig
+from .evaluation import Evaluator
+from .benchmark import BenchmarkSuite, run_suite
+from .inference import export, freeze, measure_latency
+from .synthetic import SyntheticCorpus
+from .scaling import ScalingHarness, tabulate, save
 from .transformer import TextTransformer, TextThemeTransformer
 from .vectorizer import \
     TfidfVectorizer, \
+    HashedTfidfVectorizer, \
     Vectorizer, \
-    FeatureSelectedVectorizer, \
     LogisticRegressionFsVectorizer
 
 
 @click.group()
 @click.option('-v', '--verbose', is_flag=True)
-def main(verbose: bool):
+@click.option('--cache-dir', envvar='LIMELIGHT_CACHE_DIR',
+              help='Reuse the artifacts of runs with the same inputs.')
+@click.option('--cache-size', default=10240, show_default=True,
+              help='The capacity of the cache in megabytes.')
+@click.option('--profile', is_flag=True,
+              help='Report the time and throughput of each stage.')
+@click.option('--profile-format', type=click.Choice(['json', 'prometheus']),
+              default='json', show_default=True)
+@click.option('--profile-output', type=click.File('w'),
+              help='The file to write the report. Standard error by default.')
+@click.pass_context
+def main(context,
+         verbose: bool,
+         cache_dir: str,
+         cache_size: int,
+         profile: bool,
+         profile_format: str,
+         profile_output):
     """Group."""
     LogConfiguration(verbose, 'limelight').configure()
+    if cache_dir is not None:
+        context.obj = ArtifactCache(cache_dir, cache_size << 20)
+    if profile:
+        profile_output = profile_output or click.get_text_stream('stderr')
+        PROFILER.enable()
+        started = time.perf_counter()
+
+        def report():
+            PROFILER.record(f'command.{context.invoked_subcommand}',
+                            time.perf_counter() - started)
+            if profile_format == 'json':
+                profile_output.write(PROFILER.to_json() + '\n')
+            else:
+                profile_output.write(PROFILER.to_prometheus())
+            profile_output.flush()
+
+        context.call_on_close(report)
 
 
 @main.command()
 @click.argument('destination')
-def download(destination: str):
+@click.option('--pack', is_flag=True,
+              help='Index the archive into a pack instead of extracting it.')
+def download(destination: str, pack: bool):
     """Download 20newsgroups dataset.
 
     DESTINATION    directory.
 
     """
-    Initializer(destination).prepare()
+    Initializer(destination, extract=not pack).prepare()
+
+
+@main.command(name='pack')
+@click.argument('archive', type=click.Path(exists=True, dir_okay=False))
+@click.argument('destination')
+def pack_archive(archive: str, destination: str):
+    """Pack a downloaded 20newsgroups tarball for reading without extraction.
+
+    DESTINATION    directory that `split` takes as DATASET.
+
+    """
+    DocumentPack.build(archive, destination)
 
 
 @main.command()
 @click.argument('dataset', type=Dataset.create)
 @click.argument('train')
 @click.argument('test')
-def split(dataset, train: str, test: str):
+@click.option('--seed', type=int, help='Split reproducibly.')
+@click.option('--near-duplicates',
+              type=click.Choice(['keep', 'drop', 'group']),
+              default='keep', show_default=True,
+              help='Keep near-duplicates, keep one document of each '
+              'cluster, or keep each cluster on one side.')
+@click.option('--threshold', default=0.8, show_default=True,
+              help='The Jaccard similarity of near-duplicates.')
+@click.option('--workers', type=int,
+              help='The number of processes. All the CPUs by default.')
+@click.option('--report', help='Write how much deduplication removes '
+              'in JSON to this file.')
+def split(dataset,
+          train: str,
+          test: str,
+          seed: int,
+          near_duplicates: str,
+          threshold: float,
+          workers: int,
+          report: str):
     """Split dataset into train and test."""
-    train_dataset, test_dataset = dataset.train_test_split()
+    groups = None
+    if near_duplicates != 'keep':
+        labels = Deduplicator(threshold, max_workers=workers) \
+            .cluster(dataset.sources)
+        duplicate_report = Deduplicator.report(dataset.sources, labels)
+        click.echo(json.dumps(duplicate_report.return_as_dict()), err=True)
+        if report is not None:
+            with open(report, 'w') as f:
+                json.dump(duplicate_report.return_as_dict(), f, indent=2)
+        if near_duplicates == 'drop':
+            dataset = dataset.select(Deduplicator.get_representatives(labels))
+        else:
+            groups = labels
+    train_dataset, test_dataset = dataset.train_test_split(seed, groups)
     train_dataset.save_sources_as_csv(train)
     test_dataset.save_sources_as_csv(test)
 
 
+@main.command()
+@click.argument('sources', type=DataPointSources.read_csv)
+@click.argument('directory')
+@click.argument('location')
+@click.option('--keep-headers', is_flag=True)
+@click.option('--header-field', multiple=True,
+              help='A header field to keep, e.g. Subject. '
+              'It can be given more than once.')
+@click.option('--keep-quotes', is_flag=True)
+@click.option('--keep-signatures', is_flag=True)
+@click.option('--max-tokens', type=int,
+              help='Truncate each document to this number of tokens.')
+def normalize(sources: DataPointSources,
+              directory: str,
+              location: str,
+              keep_headers: bool,
+              header_field,
+              keep_quotes: bool,
+              keep_signatures: bool,
+              max_tokens: int):
+    """Strip headers, quoted lines and signatures from documents.
+
+    SOURCES     A CSV file that the `split` subcommnad emitted.
+
+    DIRECTORY   The normalized documents are packed into this directory.
+
+    LOCATION    A CSV file listing the normalized documents, which the
+    other subcommands take in place of SOURCES.
+    """
+    normalizer = MessageNormalizer(keep_headers,
+                                   header_field,
+                                   keep_quotes,
+                                   keep_signatures,
+                                   max_tokens)
+    try:
+        normalized = normalizer.write(sources, directory)
+    except ValueError as error:
+        raise click.UsageError(str(error))
+    normalized.save_csv(location)
+    click.echo(json.dumps({'bytes': int(sources.get_sizes().sum()),
+                           'normalized_bytes':
+                           int(normalized.get_sizes().sum())}),
+               err=True)
+
+
 @main.command()
 @click.argument('train', type=DataPointSources.read_csv)
 @click.argument('location')
-def sparsevec(train: DataPointSources, location: str):
+def tokenize(train: DataPointSources, location: str):
+    """Tokenize documents once into a directory of token id arrays.
+
+    TRAIN   A CSV file that the `split` subcommnad emitted.
+    """
+    texts = Dataset(train, TextTransformer()).prefetch()
+    themes = Themes([source.get_theme() for source in train])
+    TokenizedCorpus.build(texts, themes).save(location)
+
+
+@main.command()
+@click.argument('train', type=click.Path(exists=True, dir_okay=False))
+@click.argument('location')
+@click.option('--tokens', type=click.Path(exists=True, file_okay=False),
+              help='A directory that the `tokenize` subcommand emitted.')
+@click.option('--min-df', default=1, show_default=True)
+@click.option('--max-df', default=1.0, show_default=True)
+@click.option('--ngram', default=1, show_default=True,
+              help='The maximum length of n-grams.')
+@click.option('--hash-bits', type=int,
+              help='Hash features into 2^HASH_BITS columns so that '
+              '`update` can refresh document frequencies. '
+              'MIN_DF and MAX_DF are ignored.')
+@click.pass_obj
+def sparsevec(cache,
+              train: str,
+              location: str,
+              tokens: str,
+              min_df: int,
+              max_df: float,
+              ngram: int,
+              hash_bits: int):
     """Train a sparse vectorizer.
 
     TRAIN   A CSV file that the `split` subcommnad emitted.
     """
-    texts = Texts(Dataset(train, TextTransformer()))
-    vectorizer = TfidfVectorizer()
-    vectorizer.fit(texts)
-    vectorizer.dump(location)
+    if hash_bits is not None and tokens is not None:
+        raise click.UsageError('--hash-bits does not take --tokens.')
+
+    def compute():
+        if hash_bits is not None:
+            vectorizer = HashedTfidfVectorizer(1 << hash_bits, (1, ngram))
+            vectorizer.fit(DataPointSources.read_csv(train).iter_texts())
+        elif tokens is None:
+            texts = DataPointSources.read_csv(train).iter_texts()
+            vectorizer = TfidfVectorizer(
+                min_df=min_df, max_df=max_df, ngram_range=(1, ngram))
+            vectorizer.fit(texts)
+        else:
+            vectorizer = CorpusTfidfVectorizer(min_df, max_df, (1, ngram))
+            vectorizer.fit(TokenizedCorpus.load(tokens))
+        vectorizer.dump(location)
+
+    run_cached(cache,
+               lambda: create_sparsevec_fingerprint(
+                   train, tokens, min_df, max_df, ngram, hash_bits),
+               location,
+               compute)
 
 
 @main.command()
-@click.argument('train', type=DataPointSources.read_csv)
-@click.argument('vectorizer', type=Vectorizer.load)
+@click.argument('train', type=click.Path(exists=True, dir_okay=False))
+@click.argument('vectorizer', type=click.Path(exists=True, dir_okay=False))
 @click.argument('location')
-def featuresel(train, vectorizer, location: str):
+@click.option('--tokens', type=click.Path(exists=True, file_okay=False),
+              help='A directory that the `tokenize` subcommand emitted '
+              'from TRAIN. VECTORIZER must accept it.')
+@click.option('--max-features', default=20000, show_default=True)
+@click.pass_obj
+def featuresel(cache,
+               train: str,
+               vectorizer: str,
+               location: str,
+               tokens: str,
+               max_features: int):
     """Create a vectorizer apply Feature selection to a base vectorizer."""
-    dataset = np.array(Dataset(train, TextThemeTransformer()))
-    texts = Texts(dataset[:, 0])
-    themes = Themes(dataset[:, 1])
-    train_vectorizer = LogisticRegressionFsVectorizer.create(
-        vectorizer, 20000
-    )
-    train_vectorizer.fit(texts, themes)
-    train_vectorizer.dump(location)
+    def compute():
+        if tokens is None:
+            corpus = Corpus.read(DataPointSources.read_csv(train))
+            texts = corpus.texts
+            themes = corpus.themes
+        else:
+            texts = TokenizedCorpus.load(tokens)
+            themes = texts.get_themes()
+        train_vectorizer = LogisticRegressionFsVectorizer.create(
+            Vectorizer.load(vectorizer), max_features
+        )
+        train_vectorizer.fit(texts, themes)
+        train_vectorizer.dump(location)
+
+    run_cached(cache,
+               lambda: create_featuresel_fingerprint(
+                   train, vectorizer, max_features, tokens),
+               location,
+               compute)
+
+
+@main.command()
+@click.argument('train', type=DataPointSources.read_csv)
+@click.argument('location')
+@click.option('--tokens', type=TokenizedCorpus.load,
+              help='A directory that the `tokenize` subcommand emitted.')
+@click.option('--num-buckets', default=0, show_default=True,
+              help='The number of hashed bigram ids.')
+@click.option('--min-count', default=1, show_default=True)
+def encoder(train: DataPointSources,
+            location: str,
+            tokens,
+            num_buckets: int,
+            min_count: int):
+    """Fit a token id encoder for the embedding bag classifier."""
+    token_id_encoder = TokenIdEncoder(num_buckets, min_count)
+    if tokens is None:
+        token_id_encoder.fit(train.iter_texts())
+    else:
+        token_id_encoder.fit(tokens)
+    token_id_encoder.dump(location)
+
+
+@main.command()
+@click.argument('vectorizer', type=click.Path(exists=True, dir_okay=False))
+@click.argument('train', type=click.Path(exists=True, dir_okay=False))
+@click.argument('location')
+@click.option('--epochs', default=10, show_default=True)
+@click.option('--batch-size', default=32, show_default=True)
+@click.option('--learning-rate', default=1e-3, show_default=True)
+@click.option('--units', default=64, show_default=True,
+              help='The units of the hidden layer or the embeddings.')
+@click.option('--dropout-rate', default=0.2, show_default=True)
+@click.option('--batch-bytes', type=int,
+              help='Batch documents up to this many bytes in total '
+              'instead of BATCH_SIZE documents.')
+@click.option('--bucket-size', default=1000, show_default=True,
+              help='The number of documents sorted by length together '
+              'with --batch-bytes. 0 disables bucketing.')
+@click.option('--checkpoint-dir',
+              help='Save the state of training into this directory.')
+@click.option('--checkpoint-period', default=1000, show_default=True,
+              help='The number of batches between checkpoints.')
+@click.option('--keep-checkpoints', default=3, show_default=True)
+@click.option('--resume', is_flag=True,
+              help='Continue from the latest checkpoint.')
+@click.pass_obj
+def train(cache,
+          vectorizer: str,
+          train: str,
+          location: str,
+          epochs: int,
+          batch_size: int,
+          learning_rate: float,
+          units: int,
+          dropout_rate: float,
+          batch_bytes: int,
+          bucket_size: int,
+          checkpoint_dir: str,
+          checkpoint_period: int,
+          keep_checkpoints: int,
+          resume: bool):
+    """Train a classifier.
+
+    It trains an embedding bag classifier if the `encoder` subcommand
+    emitted VECTORIZER, and a multi-layer perceptron otherwise.
+    """
+    if resume and checkpoint_dir is None:
+        raise click.UsageError('--resume takes --checkpoint-dir.')
+
+    def compute():
+        trained_vectorizer = Vectorizer.load(vectorizer)
+        number_of_features = trained_vectorizer.get_num_of_features()
+        number_of_themes = Theme.num_of_themes()
+        if isinstance(trained_vectorizer, TokenIdEncoder):
+            classifier = EmbeddingBagClassifier(
+                number_of_features, number_of_themes, units, dropout_rate)
+        else:
+            classifier = MlpClassifier(
+                number_of_features, number_of_themes, units, dropout_rate)
+        dataset = Dataset.read_sources_from_csv(train, TextThemeTransformer())
+        if batch_bytes is None:
+            dataloader = DataLoader(dataset,
+                                    batch_size=batch_size,
+                                    shuffle=True,
+                                    collate_fn=PairCollator())
+        else:
+            dataloader = DataLoader(
+                dataset,
+                batch_sampler=BudgetBatchSampler(
+                    dataset.sources.get_sizes(), batch_bytes, bucket_size),
+                collate_fn=PairCollator())
+        model = PreTrainedTextVecMlpClassifier(trained_vectorizer, classifier)
+        checkpointer = None if checkpoint_dir is None else Checkpointer(
+            checkpoint_dir, checkpoint_period, keep_checkpoints)
+        model.train(dataloader,
+                    epochs,
+                    learning_rate,
+                    checkpointer=checkpointer,
+                    resume=resume)
+        model.dump(location)
+
+    run_cached(cache,
+               lambda: create_train_fingerprint(
+                   vectorizer,
+                   train,
+                   [epochs, batch_size, learning_rate, units, dropout_rate,
+                    batch_bytes, bucket_size]),
+               location,
+               compute)
 
 
 @main.command()
-@click.argument('vectorizer', type=Vectorizer.load)
-@click.argument('train', type=Dataset.read_sources_from_csv)
+@click.argument('model', type=click.Path(exists=True, dir_okay=False))
+@click.argument('sources', type=click.Path(exists=True, dir_okay=False))
 @click.argument('location')
-def train(vectorizer, train, location):
-    """Train a classifier."""
-    number_of_features = vectorizer.get_num_of_features()
+@click.option('--epochs', default=3, show_default=True)
+@click.option('--batch-size', default=32, show_default=True)
+@click.option('--learning-rate', default=1e-3, show_default=True)
+@click.pass_obj
+def update(cache,
+           model: str,
+           sources: str,
+           location: str,
+           epochs: int,
+           batch_size: int,
+           learning_rate: float):
+    """Fine-tune a trained model on new documents only.
+
+    SOURCES   A CSV file of the new documents in the format that the
+    `split` subcommand emits.
+
+    A vectorizer that `sparsevec --hash-bits` emitted also updates its
+    document frequencies. The selected features are kept.
+    """
+    def compute():
+        trained_model = PreTrainedTextVecMlpClassifier.load(model)
+        corpus = Corpus.read(DataPointSources.read_csv(sources))
+        trained_model.update(corpus.texts,
+                             corpus.themes,
+                             epochs,
+                             batch_size,
+                             learning_rate)
+        trained_model.dump(location)
+
+    run_cached(cache,
+               lambda: create_update_fingerprint(
+                   model, sources, [epochs, batch_size, learning_rate]),
+               location,
+               compute)
 
+
+@main.command(name='export')
+@click.argument('model', type=PreTrainedTextVecMlpClassifier.load)
+@click.argument('location')
+def export_model(model, location: str):
+    """Write the classifier of MODEL as a frozen TorchScript graph.
+
+    `torch.jit.load` loads LOCATION without limelight. It takes what
+    ``as_torch_tensor`` of the vectors of the vectorizer of MODEL returns.
+    """
+    export(model.classifier, location)
+
+
+@main.command()
+@click.argument('model', type=PreTrainedTextVecMlpClassifier.load)
+@click.option('--batch-sizes', default='1,4,16,64,256,1024',
+              show_default=True, help='Comma separated batch sizes.')
+@click.option('--warmup', default=3, show_default=True)
+@click.option('--repeat', default=20, show_default=True)
+@click.option('--output', help='Write the results in JSON to this file.')
+def inferbench(model,
+               batch_sizes: str,
+               warmup: int,
+               repeat: int,
+               output: str):
+    """Compare the latency of the eager and frozen classifier of MODEL."""
+    sizes = [int(size) for size in batch_sizes.split(',')]
+    results = measure_latency(
+        model.classifier, freeze(model.classifier), sizes, warmup, repeat)
+    if output is not None:
+        BenchmarkSuite.save(results, output)
+    medians = {result.name: result.get_median() for result in results}
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['batch_size', 'eager_ms', 'frozen_ms', 'speedup'])
+    for size in sizes:
+        eager = medians[f'eager/{size}']
+        frozen = medians[f'frozen/{size}']
+        writer.writerow([size, f'{eager * 1e3:.3f}', f'{frozen * 1e3:.3f}',
+                         f'{eager / frozen:.2f}'])
+
+
+@main.command()
+@click.argument('model', type=click.Path(exists=True, dir_okay=False))
+@click.argument('test', type=DataPointSources.read_csv)
+@click.option('--batch-size', default=256, show_default=True)
+@click.option('--workers', type=int,
+              help='The number of processes. All the CPUs by default.')
+@click.option('--output', help='Write the report in JSON to this file.')
+def evaluate(model: str,
+             test: DataPointSources,
+             batch_size: int,
+             workers: int,
+             output: str):
+    """Report accuracy, precision, recall and throughput of MODEL.
+
+    MODEL   A file that the `train` subcommand emitted.
+
+    TEST    A CSV file that the `split` subcommnad emitted.
+    """
+    report = Evaluator(model, batch_size, workers).evaluate(test)
+    if output is None:
+        click.echo(json.dumps(report))
+    else:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+    click.echo(f'accuracy: {report["accuracy"]:.4f}, '
+               f'{report["documents_per_second"]:.1f} documents/s',
+               err=True)
+
+
+@main.command(name='benchmark')
+@click.argument('output')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False),
+              help='Results of an earlier run to compare with.')
+@click.option('--documents-per-theme', default=50, show_default=True)
+@click.option('--warmup', default=1, show_default=True)
+@click.option('--repeat', default=5, show_default=True)
+@click.option('--tolerance', default=0.1, show_default=True,
+              help='The allowed slowdown relative to the baseline.')
+def run_benchmark(output: str,
+                  baseline: str,
+                  documents_per_theme: int,
+                  warmup: int,
+                  repeat: int,
+                  tolerance: float):
+    """Time the hot paths on a fixture corpus and write JSON to OUTPUT.
+
+    It exits with status 1 if a benchmark regressed from the baseline.
+    """
+    regressions = run_suite(output,
+                            baseline,
+                            documents_per_theme,
+                            warmup,
+                            repeat,
+                            tolerance)
+    for regression in regressions:
+        click.echo(f'{regression.name} is {regression.ratio:.2f} times '
+                   'slower than the baseline', err=True)
+    if regressions:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('directory')
+@click.option('--documents', default=20000, show_default=True)
+@click.option('--mean-length', default=250.0, show_default=True,
+              help='The mean number of words of a document.')
+@click.option('--sigma', default=1.0, show_default=True,
+              help='The standard deviation of the log of lengths.')
+@click.option('--skew', default=0.0, show_default=True,
+              help='The Zipf exponent of the theme distribution.')
+@click.option('--vocabulary-size', default=50000, show_default=True)
+@click.option('--seed', default=0, show_default=True)
+def synthesize(directory: str,
+               documents: int,
+               mean_length: float,
+               sigma: float,
+               skew: float,
+               vocabulary_size: int,
+               seed: int):
+    """Write a synthetic corpus in the layout of 20 newsgroups."""
+    SyntheticCorpus(documents,
+                    mean_length,
+                    sigma,
+                    skew,
+                    vocabulary_size,
+                    seed=seed).write(directory)
+
+
+@main.command(name='scaling')
+@click.argument('directory')
+@click.option('--sizes', multiple=True, type=int,
+              default=[2000, 20000, 200000], show_default=True)
+@click.option('--max-features', default=20000, show_default=True)
+@click.option('--epochs', default=1, show_default=True)
+@click.option('--output', help='Write the measurements in JSON.')
+def run_scaling(directory: str,
+                sizes,
+                max_features: int,
+                epochs: int,
+                output: str):
+    """Tabulate time and peak RSS of each stage at growing corpus sizes."""
+    measurements = ScalingHarness(
+        directory, sorted(sizes), max_features, epochs).run()
+    click.echo(tabulate(measurements))
+    if output is not None:
+        save(measurements, output)
+
+
+@main.command(name='pipeline')
+@click.argument('dataset', type=Dataset.create)
+@click.argument('directory')
+@click.option('--max-features', default=20000, show_default=True)
+@click.option('--epochs', default=10, show_default=True)
+@click.option('--batch-size', default=32, show_default=True)
+@click.option('--learning-rate', default=1e-3, show_default=True)
+@click.option('--units', default=64, show_default=True)
+@click.option('--dropout-rate', default=0.2, show_default=True)
+@click.option('--seed', type=int, help='Split reproducibly. Without it, no '
+              'stage is restored from the cache.')
+@click.pass_obj
+def run_pipeline(cache,
+                 dataset,
+                 directory: str,
+                 max_features: int,
+                 epochs: int,
+                 batch_size: int,
+                 learning_rate: float,
+                 units: int,
+                 dropout_rate: float,
+                 seed: int):
+    """Run split, sparsevec, featuresel and train in one process.
+
+    DIRECTORY   The artifacts of the subcommands are written here.
+    """
+    Pipeline(directory,
+             max_features,
+             epochs,
+             batch_size,
+             learning_rate,
+             units,
+             dropout_rate,
+             seed,
+             cache).run(dataset)
+
+
+@main.command(name='sweep')
+@click.argument('dataset', type=Dataset.create)
+@click.argument('directory')
+@click.option('--folds', default=5, show_default=True)
+@click.option('--max-features', multiple=True, type=int, default=[20000],
+              show_default=True)
+@click.option('--units', multiple=True, type=int, default=[64],
+              show_default=True)
+@click.option('--dropout-rate', multiple=True, type=float, default=[0.2],
+              show_default=True)
+@click.option('--learning-rate', multiple=True, type=float, default=[1e-3],
+              show_default=True)
+@click.option('--epochs', default=10, show_default=True)
+@click.option('--batch-size', default=32, show_default=True)
+@click.option('--workers', type=int,
+              help='The number of processes. All the CPUs by default.')
+@click.option('--seed', type=int, help='Split reproducibly.')
+def run_sweep(dataset,
+              directory: str,
+              folds: int,
+              max_features,
+              units,
+              dropout_rate,
+              learning_rate,
+              epochs: int,
+              batch_size: int,
+              workers: int,
+              seed: int):
+    """Cross-validate combinations of hyperparameters.
+
+    Each option that can be given multiple times adds values to the grid.
+    DIRECTORY receives the manifests of the folds and `report.json`.
+    """
+    configs = SweepConfig.create_grid(
+        max_features, units, dropout_rate, learning_rate)
+    report = Sweep(directory,
+                   configs,
+                   folds,
+                   epochs,
+                   batch_size,
+                   workers,
+                   seed).run(dataset)
+    click.echo(json.dumps(report['summary'], indent=2))
+
+
+@main.command(name='index')
+@click.argument('vectorizer', type=click.Path(exists=True, dir_okay=False))
+@click.argument('sources', type=DataPointSources.read_csv)
+@click.argument('location')
+@click.option('--num-bits', default=16, show_default=True)
+@click.option('--num-tables', default=8, show_default=True)
+@click.option('--update', is_flag=True,
+              help='Insert SOURCES into the index at LOCATION. '
+              'VECTORIZER must be the one the index was built with.')
+def build_index(vectorizer: str,
+                sources: DataPointSources,
+                location: str,
+                num_bits: int,
+                num_tables: int,
+                update: bool):
+    """Build an index to look up similar documents.
+
+    SOURCES   A CSV file that the `split` subcommnad emitted.
+    """
+    if update:
+        similar_document_index = SimilarDocumentIndex.load(location)
+        try:
+            similar_document_index.check_vectorizer(vectorizer)
+        except ValueError as error:
+            raise click.UsageError(str(error))
+    else:
+        similar_document_index = SimilarDocumentIndex(
+            Vectorizer.load(vectorizer),
+            num_bits,
+            num_tables,
+            vectorizer_digest=SimilarDocumentIndex.get_digest(vectorizer))
+    similar_document_index.add(sources)
+    similar_document_index.dump(location)
+
+
+@main.command()
+@click.argument('location', type=SimilarDocumentIndex.load)
+@click.argument('queries', type=DataPointSources.read_csv)
+@click.option('-k', default=10, show_default=True)
+@click.option('--exact', is_flag=True, help='Search by brute force.')
+def similar(location, queries: DataPointSources, k: int, exact: bool):
+    """Print the documents similar to QUERIES in CSV format."""
+    texts = queries.read_many()
+    search = location.exact_query if exact else location.query
+    writer = csv.writer(sys.stdout)
+    writer.writerow(['query_theme', 'query_id', 'theme', 'id', 'similarity'])
+    for query, neighbours in zip(queries, search(texts, k)):
+        query_dict = query.return_as_dict()
+        for neighbour in neighbours:
+            found = neighbour.return_as_dict()
+            writer.writerow([query_dict['theme'], query_dict['id'],
+                             found['theme'], found['id'],
+                             found['similarity']])
+
+
+@main.command()
+@click.argument('location', type=SimilarDocumentIndex.load)
+@click.argument('queries', type=DataPointSources.read_csv)
+@click.option('-k', default=10, show_default=True)
+def indexbench(location, queries: DataPointSources, k: int):
+    """Measure recall and latency of INDEX against exact search."""
+    texts = queries.read_many()
+    click.echo(json.dumps(location.benchmark(texts, k).return_as_dict()))
@@ -0,0 +1,5 @@
+"""Run the entrypoint with `python -m limelight`."""
+from . import main
+
+
+main()
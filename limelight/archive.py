@@ -0,0 +1,228 @@
+"""Serve documents from an indexed pack of the downloaded archive.
+
+A gzipped tarball cannot be read at random without decompressing it
+from the start, so :py:meth:`DocumentPack.build` recompresses each
+document independently into one file and records where it starts.
+
+"""
+import os
+import os.path
+import re
+import tarfile
+import zlib
+from logging import getLogger
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .theme import Theme
+
+
+class DocumentPack:
+    """Documents compressed one by one into :py:attr:`DOCUMENTS`.
+
+    Attributes
+    ----------
+    directory: str
+
+    themes: numpy.ndarray
+        The value of the theme of each document.
+
+    ids: numpy.ndarray
+
+    offsets: numpy.ndarray
+        Where the compressed bytes of each document start.
+
+    lengths: numpy.ndarray
+        The number of the compressed bytes of each document.
+
+    sizes: numpy.ndarray
+        The number of the bytes of each document.
+
+    """
+
+    DOCUMENTS = 'documents.bin'
+    INDEX = 'index.npz'
+    LOGGER = getLogger(__name__)
+    # Whether each directory has a pack, decided when it is first read.
+    _PACKS: Dict[str, Optional['DocumentPack']] = {}
+
+    def __init__(self, directory: str):
+        """Read the index in `directory`."""
+        self.directory = directory
+        self._descriptor: Optional[int] = None
+        self._pid: Optional[int] = None
+        with np.load(self.get_index()) as arrays:
+            self.themes = arrays['themes']
+            self.ids = arrays['ids']
+            self.offsets = arrays['offsets']
+            self.lengths = arrays['lengths']
+            self.sizes = arrays['sizes']
+        self.rows = {key: row for row, key in enumerate(
+            zip(self.themes.tolist(), self.ids.tolist()))}
+
+    def __len__(self) -> int:
+        """Return the number of documents."""
+        return len(self.ids)
+
+    def get_index(self) -> str:
+        """Return the path to the index."""
+        return os.path.join(self.directory, self.INDEX)
+
+    def get_documents(self) -> str:
+        """Return the path to the compressed documents."""
+        return os.path.join(self.directory, self.DOCUMENTS)
+
+    def get_keys(self) -> List[Tuple[Theme, int]]:
+        """Return the theme and the id of each document."""
+        return [(Theme(theme), point_id) for theme, point_id in
+                zip(self.themes.tolist(), self.ids.tolist())]
+
+    def read(self, theme: Theme, point_id: int) -> bytes:
+        """Return the bytes of a document.
+
+        Raises
+        ------
+        KeyError
+            If the pack has no such document.
+
+        """
+        row = self.rows[(theme.value, point_id)]
+        compressed = os.pread(self._get_descriptor(),
+                              int(self.lengths[row]),
+                              int(self.offsets[row]))
+        return zlib.decompress(compressed)
+
+    def get_size(self, theme: Theme, point_id: int) -> int:
+        """Return the number of the bytes of a document."""
+        return int(self.sizes[self.rows[(theme.value, point_id)]])
+
+    def _get_descriptor(self) -> int:
+        # `os.pread` does not move a shared position, so threads share a
+        # descriptor. Forked processes open their own.
+        if self._pid != os.getpid():
+            if self._descriptor is not None:
+                os.close(self._descriptor)
+            self._descriptor = os.open(self.get_documents(), os.O_RDONLY)
+            self._pid = os.getpid()
+        return self._descriptor
+
+    def close(self) -> None:
+        """Close the compressed documents."""
+        if self._descriptor is not None:
+            os.close(self._descriptor)
+            self._descriptor = None
+            self._pid = None
+
+    def __enter__(self):
+        """Return itself."""
+        return self
+
+    def __exit__(self, *args):
+        """See :py:meth:`close`."""
+        self.close()
+
+    def __del__(self):
+        """See :py:meth:`close`."""
+        self.close()
+
+    @classmethod
+    def open(cls, directory: str) -> Optional['DocumentPack']:
+        """Return the pack in `directory`, or `None` if it has no pack.
+
+        Whether `directory` has a pack is looked up once, so that texts
+        are read without checking the index each time. Packs written by
+        :py:meth:`write` replace the previous ones. See :py:meth:`forget`
+        for packs written or removed otherwise.
+
+        """
+        try:
+            return cls._PACKS[directory]
+        except KeyError:
+            pass
+        pack = DocumentPack(directory) if os.path.isdir(directory) \
+            and os.path.isfile(os.path.join(directory, cls.INDEX)) else None
+        cls._PACKS[directory] = pack
+        return pack
+
+    @classmethod
+    def forget(cls, directory: str) -> None:
+        """Look up the pack in `directory` again when it is next opened.
+
+        The pack opened before stays readable until nothing reads it.
+
+        """
+        cls._PACKS.pop(directory, None)
+
+    @classmethod
+    def build(cls, archive: str, directory: str, level=6) -> 'DocumentPack':
+        """Pack the documents of the 20 Newsgroups tarball `archive`.
+
+        The tarball is read once as a stream.
+
+        Parameters
+        ----------
+        archive: str
+
+        directory: str
+            It is created if it does not exist.
+
+        level: int
+            The level of zlib compression.
+
+        """
+        with tarfile.open(archive, 'r|gz') as tar:
+            return cls.write(directory, cls._read_members(tar), level)
+
+    @classmethod
+    def _read_members(cls, tar):
+        themes_by_name = {theme.get_theme_name(): theme for theme in Theme}
+        for member in tar:
+            parts = member.name.split('/')
+            if not member.isfile() or len(parts) < 2 \
+                    or parts[-2] not in themes_by_name \
+                    or not re.fullmatch(r'\d+', parts[-1]):
+                continue
+            yield (themes_by_name[parts[-2]],
+                   int(parts[-1]),
+                   tar.extractfile(member).read())
+
+    @classmethod
+    def write(cls,
+              directory: str,
+              documents: Iterable[Tuple[Theme, int, bytes]],
+              level=6) -> 'DocumentPack':
+        """Pack `documents`, the theme, the id and the bytes of each one.
+
+        `documents` are consumed once as a stream. Of documents with the
+        same theme and id, the last one is read.
+
+        """
+        os.makedirs(directory, exist_ok=True)
+        themes, ids, offsets, lengths, sizes = [], [], [], [], []
+        offset = 0
+        # Files are replaced, so processes reading the old pack keep
+        # reading the old files.
+        documents_file = os.path.join(directory, cls.DOCUMENTS)
+        with open(f'{documents_file}.tmp', 'wb') as f:
+            for theme, point_id, document in documents:
+                compressed = zlib.compress(document, level)
+                f.write(compressed)
+                themes.append(theme.value)
+                ids.append(point_id)
+                offsets.append(offset)
+                lengths.append(len(compressed))
+                sizes.append(len(document))
+                offset += len(compressed)
+        os.replace(f'{documents_file}.tmp', documents_file)
+        # The index is written last, so an interrupted build is no pack.
+        index_file = os.path.join(directory, cls.INDEX)
+        with open(f'{index_file}.tmp', 'wb') as f:
+            np.savez(f,
+                     themes=np.asarray(themes, dtype=np.int64),
+                     ids=np.asarray(ids, dtype=np.int64),
+                     offsets=np.asarray(offsets, dtype=np.int64),
+                     lengths=np.asarray(lengths, dtype=np.int64),
+                     sizes=np.asarray(sizes, dtype=np.int64))
+        os.replace(f'{index_file}.tmp', index_file)
+        cls.LOGGER.info(f'packed {len(ids)} documents into {offset} bytes')
+        cls.forget(directory)
+        return cls.open(directory)
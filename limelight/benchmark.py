@@ -0,0 +1,268 @@
+"""Provide microbenchmarks of the hot paths on fixture corpora."""
+import json
+import os
+import os.path
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Callable, List, Optional
+import torch.nn as nn
+import torch.optim as to
+from greentea.text import Texts
+from .classifier import MlpClassifier, PreTrainedTextVecMlpClassifier
+from .dataset import Dataset
+from .news import DataPointSources
+from .pipeline import Corpus
+from .synthetic import SyntheticCorpus
+from .theme import Theme
+from .transformer import TextThemeTransformer
+from .vectorizer import TfidfVectorizer, LogisticRegressionFsVectorizer
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings of a benchmark.
+
+    Attributes
+    ----------
+    name: str
+
+    items: int
+        The number of items that a run processes.
+
+    seconds: List[float]
+        The time of each timed run.
+
+    peak_python_memory: int
+        The peak of memory allocated by a run in bytes, as `tracemalloc`
+        traces it. Buffers that numpy, scipy and torch allocate natively
+        are not counted. See :py:mod:`limelight.scaling` for the peak
+        RSS of each stage.
+
+    """
+
+    name: str
+    items: int
+    seconds: List[float]
+    peak_python_memory: int
+
+    def get_median(self) -> float:
+        """Return the median time of a run."""
+        return statistics.median(self.seconds)
+
+    def get_throughput(self) -> float:
+        """Return the items per second of the median run."""
+        return self.items / self.get_median()
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'name': self.name,
+            'items': self.items,
+            'seconds': self.seconds,
+            'median': self.get_median(),
+            'items_per_second': self.get_throughput(),
+            'peak_python_memory': self.peak_python_memory
+        }
+
+    @classmethod
+    def from_dict(cls, source: dict):
+        """Create :py:class:`BenchmarkResult` from a dict value.
+
+        Results saved before :py:attr:`peak_python_memory` was named so
+        have `peak_memory` instead.
+
+        """
+        return BenchmarkResult(source['name'],
+                               source['items'],
+                               source['seconds'],
+                               source.get('peak_python_memory',
+                                          source.get('peak_memory')))
+
+
+@dataclass
+class Regression:
+    """A benchmark slower than its baseline.
+
+    Attributes
+    ----------
+    name: str
+
+    ratio: float
+        The median time divided by the one of the baseline.
+
+    """
+
+    name: str
+    ratio: float
+
+
+@dataclass
+class Benchmark:
+    """A function to time.
+
+    Attributes
+    ----------
+    name: str
+
+    function: Callable[[], None]
+
+    items: int
+        The number of items that `function` processes.
+
+    """
+
+    name: str
+    function: Callable[[], None]
+    items: int
+
+    def run(self, warmup=1, repeat=5) -> BenchmarkResult:
+        """Time :py:attr:`function` after `warmup` runs."""
+        for _ in range(warmup):
+            self.function()
+        seconds = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            self.function()
+            seconds.append(time.perf_counter() - started)
+        tracemalloc.start()
+        try:
+            self.function()
+            _, peak_python_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return BenchmarkResult(
+            self.name, self.items, seconds, peak_python_memory)
+
+
+class BenchmarkSuite:
+    """Benchmark reading, vectorizing and training on a fixture corpus."""
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self,
+                 directory: str,
+                 documents_per_theme=50,
+                 batch_size=32,
+                 max_features=1000):
+        """Take a directory to write the fixture corpus."""
+        self.directory = directory
+        self.documents_per_theme = documents_per_theme
+        self.batch_size = batch_size
+        self.max_features = max_features
+
+    def run(self, warmup=1, repeat=5) -> List[BenchmarkResult]:
+        """Run all the benchmarks."""
+        results = []
+        for benchmark in self.create_benchmarks():
+            result = benchmark.run(warmup, repeat)
+            self.LOGGER.info(f'{result.name}: '
+                             f'{result.get_throughput():.1f} items/s')
+            results.append(result)
+        return results
+
+    def create_benchmarks(self) -> List[Benchmark]:
+        """Create the fixture corpus and the benchmarks on it."""
+        corpus_directory = os.path.join(self.directory, 'corpus')
+        SyntheticCorpus(self.documents_per_theme * Theme.num_of_themes(),
+                        vocabulary_size=5000) \
+            .write(corpus_directory)
+        manifest = os.path.join(self.directory, 'sources.csv')
+        dataset = Dataset.create(corpus_directory, TextThemeTransformer())
+        dataset.save_sources_as_csv(manifest)
+        sources = dataset.sources
+        corpus = Corpus.read(sources)
+        vectorizer = TfidfVectorizer()
+        vectorizer.fit(corpus.texts)
+        feature_selected_vectorizer = LogisticRegressionFsVectorizer.create(
+            vectorizer, self.max_features)
+        feature_selected_vectorizer.fit(corpus.texts, corpus.themes)
+        model = PreTrainedTextVecMlpClassifier(
+            feature_selected_vectorizer,
+            MlpClassifier(feature_selected_vectorizer.get_num_of_features(),
+                          Theme.num_of_themes()))
+        criterion = nn.CrossEntropyLoss()
+        optimizer = to.Adam(model.classifier.parameters())
+        batch_texts = corpus.texts[:self.batch_size]
+        batch_themes = corpus.themes[:self.batch_size]
+        return [
+            Benchmark('DataPointSource.read_text',
+                      lambda: [source.read_text() for source in sources],
+                      len(sources)),
+            Benchmark('Dataset.__getitem__',
+                      lambda: [dataset[i] for i in range(len(dataset))],
+                      len(dataset)),
+            Benchmark('DataPointSources.read_csv',
+                      lambda: DataPointSources.read_csv(manifest),
+                      len(sources)),
+            Benchmark('TfidfVectorizer.transform',
+                      lambda: vectorizer.transform(corpus.texts),
+                      len(sources)),
+            Benchmark('FeatureSelectedVectorizer.transform',
+                      lambda: feature_selected_vectorizer.transform(
+                          corpus.texts),
+                      len(sources)),
+            Benchmark('PreTrainedTextVecMlpClassifier._batch_train',
+                      lambda: model._batch_train(
+                          Texts(batch_texts), batch_themes,
+                          criterion, optimizer),
+                      len(batch_texts))
+        ]
+
+    @classmethod
+    def save(cls, results: List[BenchmarkResult], filename: str):
+        """Write `results` in JSON."""
+        with open(filename, 'w') as f:
+            json.dump([result.return_as_dict() for result in results],
+                      f,
+                      indent=2)
+
+    @classmethod
+    def load(cls, filename: str) -> List[BenchmarkResult]:
+        """Read results that :py:meth:`save` wrote."""
+        with open(filename) as f:
+            return [BenchmarkResult.from_dict(result)
+                    for result in json.load(f)]
+
+    @classmethod
+    def compare(cls,
+                results: List[BenchmarkResult],
+                baseline: List[BenchmarkResult],
+                tolerance=0.1) -> List[Regression]:
+        """Return the benchmarks slower than `baseline` beyond `tolerance`.
+
+        Medians are compared per item, so baselines measured on corpora
+        of another size are comparable.
+
+        """
+        baseline_medians = {result.name: result.get_median() / result.items
+                            for result in baseline}
+        regressions = []
+        for result in results:
+            if result.name not in baseline_medians:
+                continue
+            ratio = result.get_median() / result.items \
+                / baseline_medians[result.name]
+            if ratio > 1 + tolerance:
+                regressions.append(Regression(result.name, ratio))
+        return regressions
+
+
+def run_suite(output: str,
+              baseline: Optional[str] = None,
+              documents_per_theme=50,
+              warmup=1,
+              repeat=5,
+              tolerance=0.1) -> List[Regression]:
+    """Run :py:class:`BenchmarkSuite`, compare with `baseline` and save."""
+    with tempfile.TemporaryDirectory() as directory:
+        results = BenchmarkSuite(directory, documents_per_theme) \
+            .run(warmup, repeat)
+    BenchmarkSuite.save(results, output)
+    if baseline is None:
+        return []
+    return BenchmarkSuite.compare(
+        results, BenchmarkSuite.load(baseline), tolerance)
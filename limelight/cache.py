@@ -0,0 +1,201 @@
+"""Provide a content-addressed cache of the artifacts of subcommands."""
+import functools
+import glob
+import hashlib
+import json
+import os
+import os.path
+import shutil
+import tempfile
+from importlib import metadata
+from logging import getLogger
+from typing import Callable, Optional
+from .archive import DocumentPack
+from .news import DataPointSources
+from .normalizer import MessageNormalizer
+
+
+class Fingerprint:
+    """Digest the inputs of a stage.
+
+    Two runs of a stage whose fingerprints are equal emit the same
+    artifact, so the second one can be skipped.
+
+    """
+
+    LIBRARIES = ['limelight', 'numpy', 'scikit-learn', 'torch']
+    BLOCK_SIZE = 1 << 20
+    # The version of limelight is not bumped on every change, so its
+    # sources are digested too.
+    PACKAGE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+    def __init__(self, stage: str):
+        """Take the name of a stage."""
+        self.digest = hashlib.sha256()
+        self.add_value('stage', stage)
+        self.add_value('versions', self._get_versions())
+        self.add_value('sources', get_source_digest(self.PACKAGE_DIRECTORY))
+
+    def add_value(self, name: str, value) -> 'Fingerprint':
+        """Add a parameter that can be serialized in JSON."""
+        self.digest.update(
+            json.dumps([name, value], sort_keys=True).encode('utf-8'))
+        return self
+
+    def add_file(self, filename: str) -> 'Fingerprint':
+        """Add the contents of a file or a directory."""
+        if os.path.isdir(filename):
+            for name in sorted(os.listdir(filename)):
+                self.add_value('member', name)
+                self.add_file(os.path.join(filename, name))
+            return self
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(self.BLOCK_SIZE), b''):
+                self.digest.update(block)
+        return self
+
+    def add_manifest(self, filename: str) -> 'Fingerprint':
+        """Add a CSV file that `split` emitted and the documents it lists.
+
+        The documents are digested by their sizes and modification times
+        instead of their contents. A pack is digested by its index and
+        the configuration of the normalizer that wrote it, if any.
+
+        """
+        self.add_file(filename)
+        packs = set()
+        for source in DataPointSources.read_csv(filename):
+            pack = DocumentPack.open(source.directory)
+            if pack is None:
+                path = source.get_path()
+            elif source.directory in packs:
+                continue
+            else:
+                packs.add(source.directory)
+                path = pack.get_index()
+                configuration = os.path.join(
+                    source.directory, MessageNormalizer.CONFIGURATION)
+                if os.path.exists(configuration):
+                    self.add_file(configuration)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                self.add_value(path, [stat.st_size, stat.st_mtime_ns])
+        return self
+
+    def hexdigest(self) -> str:
+        """Return the digest as a hex string."""
+        return self.digest.hexdigest()
+
+    def _get_versions(self) -> dict:
+        versions = {}
+        for library in self.LIBRARIES:
+            try:
+                versions[library] = metadata.version(library)
+            except metadata.PackageNotFoundError:
+                versions[library] = None
+        return versions
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_digest(directory: str) -> str:
+    """Return the digest of the Python files in `directory`.
+
+    It is computed once per process, as the code that runs does not
+    change.
+
+    """
+    digest = hashlib.sha256()
+    for filename in sorted(glob.glob(os.path.join(directory, '*.py'))):
+        digest.update(os.path.basename(filename).encode('utf-8'))
+        with open(filename, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    """Store artifacts under :py:attr:`directory` keyed by fingerprints.
+
+    The least recently used artifacts are evicted when the total size
+    exceeds :py:attr:`max_bytes`.
+
+    """
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self, directory: str, max_bytes=10 * (1 << 30)):
+        """Take the cache directory and its capacity in bytes."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def restore(self, fingerprint: Fingerprint, location: str) -> bool:
+        """Copy the artifact of `fingerprint` to `location` if cached."""
+        entry = self._get_entry(fingerprint)
+        if not os.path.exists(entry):
+            return False
+        shutil.copyfile(entry, location)
+        os.utime(entry)
+        return True
+
+    def store(self, fingerprint: Fingerprint, location: str) -> None:
+        """Copy the artifact at `location` into the cache."""
+        descriptor, temporary = tempfile.mkstemp(dir=self.directory,
+                                                 suffix='.tmp')
+        os.close(descriptor)
+        try:
+            shutil.copyfile(location, temporary)
+            os.replace(temporary, self._get_entry(fingerprint))
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        self.evict()
+
+    def run(self,
+            fingerprint: Fingerprint,
+            location: str,
+            compute: Callable[[], None]) -> bool:
+        """Write the artifact to `location`, calling `compute` on a miss.
+
+        Returns
+        -------
+        bool
+            `True` if the artifact was cached.
+
+        """
+        if self.restore(fingerprint, location):
+            self.LOGGER.info(f'{location} was restored from the cache')
+            return True
+        compute()
+        self.store(fingerprint, location)
+        return False
+
+    def evict(self) -> None:
+        """Remove the least recently used artifacts over the capacity."""
+        entries = [entry for entry in os.scandir(self.directory)
+                   if entry.is_file() and not entry.name.endswith('.tmp')]
+        entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            self.LOGGER.debug(f'evicted {entry.name}')
+
+    def _get_entry(self, fingerprint: Fingerprint) -> str:
+        return os.path.join(self.directory, fingerprint.hexdigest())
+
+
+def run_cached(cache: Optional[ArtifactCache],
+               create_fingerprint: Callable[[], Fingerprint],
+               location: str,
+               compute: Callable[[], None]) -> bool:
+    """Call :py:meth:`ArtifactCache.run` if `cache` is given.
+
+    `create_fingerprint` is not called without a cache.
+
+    """
+    if cache is None:
+        compute()
+        return False
+    return cache.run(create_fingerprint(), location, compute)
@@ -0,0 +1,126 @@
+"""Save the state of training in the background to resume it later."""
+import copy
+import glob
+import os
+import os.path
+import queue
+import random
+import threading
+from logging import getLogger
+from typing import Optional
+import numpy as np
+import torch
+
+
+def get_rng_state() -> dict:
+    """Return the states of the random number generators in use."""
+    return {'torch': torch.get_rng_state(),
+            'numpy': np.random.get_state(),
+            'python': random.getstate()}
+
+
+def set_rng_state(state: dict) -> None:
+    """Restore what :py:func:`get_rng_state` returned."""
+    torch.set_rng_state(state['torch'])
+    np.random.set_state(state['numpy'])
+    random.setstate(state['python'])
+
+
+class Checkpointer:
+    """Write checkpoints of training on a background thread.
+
+    :py:meth:`save` copies the state and returns, so the training loop
+    only waits while the previous checkpoint is still being written.
+    Only the last :py:attr:`keep` checkpoints are kept.
+
+    Attributes
+    ----------
+    directory: str
+
+    period: int
+        The number of batches between checkpoints.
+
+    keep: int
+
+    """
+
+    LOGGER = getLogger(__name__)
+    PATTERN = 'checkpoint-*.pt'
+
+    def __init__(self, directory: str, period=1000, keep=3):
+        """Take the directory to write checkpoints."""
+        self.directory = directory
+        self.period = period
+        self.keep = keep
+        self._queue: queue.Queue = queue.Queue(maxsize=1)
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def save(self, state: dict) -> None:
+        """Write `state` in the background.
+
+        Parameters
+        ----------
+        state: dict
+            It must have ``epoch`` and ``batch``, the position to resume
+            from.
+
+        """
+        self._raise_error()
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._write, daemon=True)
+            self._thread.start()
+        # Training goes on updating the tensors while they are written.
+        self._queue.put(copy.deepcopy(state))
+
+    def close(self) -> None:
+        """Wait until all the checkpoints are written."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+    def __enter__(self):
+        """Return itself."""
+        return self
+
+    def __exit__(self, *args):
+        """See :py:meth:`close`."""
+        self.close()
+
+    def load_latest(self) -> Optional[dict]:
+        """Return the latest checkpoint, or `None` if there is none."""
+        filenames = self._list()
+        if not filenames:
+            return None
+        self.LOGGER.info(f'resume from {filenames[-1]}')
+        return torch.load(filenames[-1], weights_only=False)
+
+    def _list(self):
+        # Names are zero-padded, so they sort by position.
+        return sorted(glob.glob(os.path.join(self.directory, self.PATTERN)))
+
+    def _write(self):
+        while True:
+            state = self._queue.get()
+            if state is None:
+                return
+            try:
+                filename = os.path.join(
+                    self.directory,
+                    f'checkpoint-{state["epoch"]:06d}-{state["batch"]:09d}.pt')
+                temporary = f'{filename}.tmp'
+                torch.save(state, temporary)
+                os.replace(temporary, filename)
+                for old in self._list()[:-self.keep]:
+                    os.remove(old)
+                self.LOGGER.debug(f'wrote {filename}')
+            except BaseException as error:
+                self._error = error
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -1,9 +1,16 @@
 """Expose a classifier."""
 from logging import getLogger
+from typing import Callable, Optional, Tuple
+import joblib
+import numpy as np
+import torch
 import torch.nn as nn
 import torch.utils.data as tud
 import torch.optim as to
 from greentea.text import Texts
+from .checkpoint import Checkpointer, get_rng_state, set_rng_state
+from .dataset import PairCollator
+from .profiling import PROFILER, profiled, count_first_argument
 from .vectorizer import Vectorizer
 from .theme import Themes
 
@@ -38,29 +45,91 @@ class MlpClassifier(nn.Module):
         """
         super(MlpClassifier, self).__init__()
         self.dropout_rate = dropout_rate
+        self.dropout = nn.Dropout(dropout_rate)
         self.fc0 = nn.Linear(input_shape, units)
+        self.relu = nn.ReLU()
         self.fc1 = nn.Linear(units, num_classes)
         if num_classes == 2:
             self.activation = nn.Sigmoid()
         else:
-            self.activation = nn.LogSoftmax(dim=num_classes)
+            self.activation = nn.LogSoftmax(dim=1)
 
     def forward(self, x):
         """Define the computation performed at every call."""
-        x = nn.Dropout(self.dropout_rate)(x)
+        x = self.dropout(x)
         x = self.fc0(x)
-        x = nn.ReLU()(x)
-        x = nn.Dropout(self.dropout_rate)(x)
+        x = self.relu(x)
+        x = self.dropout(x)
         x = self.fc1(x)
         return self.activation(x)
 
+    def __setstate__(self, state):
+        """Add the submodules that models pickled by older versions lack."""
+        super(MlpClassifier, self).__setstate__(state)
+        if 'dropout' not in self._modules:
+            self.dropout = nn.Dropout(self.dropout_rate)
+            self.relu = nn.ReLU()
+
+
+class EmbeddingBagClassifier(nn.Module):
+    """A fastText-style classifier that averages token embeddings.
+
+    It takes the pair of token ids and offsets that
+    :py:class:`limelight.tokens.TokenIdEncoder` emits, so its cost
+    depends on the length of documents instead of the vocabulary size.
+
+    References
+    ----------
+    https://arxiv.org/abs/1607.01759
+
+    """
+
+    def __init__(self,
+                 num_embeddings,
+                 num_classes,
+                 embedding_dim=64,
+                 dropout_rate=0.2):
+        """Construct the classifier.
+
+        Parameters
+        ----------
+        num_embeddings: int
+            The number of token and bigram ids.
+
+        num_classes: int
+            number of output classes.
+
+        embedding_dim: int
+
+        dropout_rate: float
+            Percentage of the averaged embeddings to drop.
+
+        """
+        super(EmbeddingBagClassifier, self).__init__()
+        self.embedding = nn.EmbeddingBag(
+            num_embeddings, embedding_dim, mode='mean')
+        self.dropout = nn.Dropout(dropout_rate)
+        self.fc = nn.Linear(embedding_dim, num_classes)
+
+    def forward(self, x: Tuple[torch.Tensor, torch.Tensor]):
+        """Take a pair of token ids and offsets."""
+        token_ids, offsets = x
+        x = self.embedding(token_ids, offsets)
+        x = self.dropout(x)
+        return self.fc(x)
+
 
 class PreTrainedTextVecMlpClassifier:
-    """Use a pre-trained text vectorizer."""
+    """Use a pre-trained text vectorizer.
+
+    :py:attr:`classifier` takes what ``as_torch_tensor`` of the vectors
+    of :py:attr:`vectorizer` returns.
+
+    """
 
     LOGGER = getLogger(__name__)
 
-    def __init__(self, vectorizer: Vectorizer, classifier: MlpClassifier):
+    def __init__(self, vectorizer: Vectorizer, classifier: nn.Module):
         """Take a trained vectorizer a :py:class:`MlpClassifier` to train."""
         self.vectorizer = vectorizer
         self.classifier = classifier
@@ -68,49 +137,218 @@ class PreTrainedTextVecMlpClassifier:
     def train(self,
               dataloader: tud.DataLoader,
               epochs=1000,
-              learning_rate=1e-3):
+              learning_rate=1e-3,
+              vectorized=False,
+              checkpointer: Optional[Checkpointer] = None,
+              resume=False):
         """Fit :py:attr:`classifier` on `dataloader`.
 
         Parameters
         ----------
         dataloader: DataLoader
 
+        vectorized: bool
+            `True` if `dataloader` emits pairs of feature tensors that
+            :py:attr:`vectorizer` has already transformed and label
+            tensors instead of pairs of texts and themes.
+
+        checkpointer: Optional[Checkpointer]
+            Save the state of training every ``checkpointer.period``
+            batches and at the end of each epoch.
+
+        resume: bool
+            Continue from the latest checkpoint of `checkpointer`, if
+            any, as if the run had not stopped.
+
         """
+        self.classifier.train()
         parameters = self.classifier.parameters()
         criterion = nn.CrossEntropyLoss()
         optimizer = to.Adam(parameters, lr=learning_rate)
-        for epoch in range(epochs):
+        if checkpointer is None:
+            for epoch in range(epochs):
+                self.LOGGER.info(f'epoch {epoch + 1}')
+                self._epoch_train(
+                    dataloader, criterion, optimizer, epoch + 1,
+                    vectorized=vectorized)
+            return
+        try:
+            self._train_with_checkpoints(dataloader,
+                                         epochs,
+                                         criterion,
+                                         optimizer,
+                                         vectorized,
+                                         checkpointer,
+                                         resume)
+        finally:
+            checkpointer.close()
+
+    def _train_with_checkpoints(self,
+                                dataloader: tud.DataLoader,
+                                epochs: int,
+                                criterion,
+                                optimizer,
+                                vectorized: bool,
+                                checkpointer: Checkpointer,
+                                resume: bool):
+        state = checkpointer.load_latest() if resume else None
+        first_epoch = 0
+        if state is not None:
+            self.classifier.load_state_dict(state['classifier'])
+            optimizer.load_state_dict(state['optimizer'])
+            first_epoch = state['epoch']
+            if state['batch'] == 0:
+                # The checkpoint is at the end of an epoch.
+                set_rng_state(state['rng'])
+                state = None
+        for epoch in range(first_epoch, epochs):
             self.LOGGER.info(f'epoch {epoch + 1}')
-            self._epoch_train(dataloader, criterion, optimizer, epoch + 1)
+            resumed = state is not None and state['epoch'] == epoch
+            epoch_rng_state = state['epoch_rng'] if resumed \
+                else get_rng_state()
+            # The order of batches and the seed of workers depend only on
+            # the state at the start of the epoch, so resuming skips
+            # batches without reading them.
+            set_rng_state(epoch_rng_state)
+            batches = list(dataloader.batch_sampler)
+            generator = torch.Generator()
+            generator.manual_seed(
+                int(torch.empty((), dtype=torch.int64).random_().item()))
+            first_batch = state['batch'] if resumed else 0
+            epoch_dataloader = self._skip_batches(
+                dataloader, batches[first_batch:], generator)
+            if resumed:
+                set_rng_state(state['rng'])
+
+            def checkpoint(batch: int):
+                checkpointer.save({
+                    'epoch': epoch if batch < len(batches) else epoch + 1,
+                    'batch': batch if batch < len(batches) else 0,
+                    'classifier': self.classifier.state_dict(),
+                    'optimizer': optimizer.state_dict(),
+                    'epoch_rng': epoch_rng_state,
+                    'rng': get_rng_state()
+                })
+
+            self._epoch_train(
+                epoch_dataloader, criterion, optimizer, epoch + 1,
+                vectorized=vectorized,
+                first_batch=first_batch,
+                checkpoint=checkpoint,
+                checkpoint_period=checkpointer.period)
+
+    @classmethod
+    def _skip_batches(cls,
+                      dataloader: tud.DataLoader,
+                      batches: list,
+                      generator: torch.Generator) -> tud.DataLoader:
+        # Copy `dataloader` but for the batches and the generator.
+        options = {}
+        if dataloader.num_workers > 0:
+            options['prefetch_factor'] = dataloader.prefetch_factor
+            options['persistent_workers'] = dataloader.persistent_workers
+        return tud.DataLoader(dataloader.dataset,
+                              batch_sampler=batches,
+                              num_workers=dataloader.num_workers,
+                              collate_fn=dataloader.collate_fn,
+                              pin_memory=dataloader.pin_memory,
+                              timeout=dataloader.timeout,
+                              worker_init_fn=dataloader.worker_init_fn,
+                              multiprocessing_context=dataloader
+                              .multiprocessing_context,
+                              generator=generator,
+                              **options)
+
+    def update(self,
+               texts: Texts,
+               themes: Themes,
+               epochs=3,
+               batch_size=32,
+               learning_rate=1e-3):
+        """Continue training on new documents only.
+
+        :py:attr:`vectorizer` updates its statistics with `texts` if it
+        learns incrementally, keeping its features, and
+        :py:attr:`classifier` starts from its current weights.
+
+        """
+        try:
+            self.vectorizer.partial_fit(texts)
+        except NotImplementedError as error:
+            self.LOGGER.info(f'{error} Its statistics are kept.')
+        dataloader = tud.DataLoader(list(zip(texts, themes)),
+                                    batch_size=batch_size,
+                                    shuffle=True,
+                                    collate_fn=PairCollator())
+        self.train(dataloader, epochs, learning_rate)
 
     def _epoch_train(self,
                      dataloader: tud.DataLoader,
                      criterion,
                      optimizer,
                      epoch,
-                     log_loss_period=2000):
+                     log_loss_period=2000,
+                     vectorized=False,
+                     first_batch=0,
+                     checkpoint: Optional[Callable[[int], None]] = None,
+                     checkpoint_period=0):
         running_loss = 0.0
-        for batch_index, dataset in enumerate(dataloader):
-            self.LOGGER.verbose(f'batch {batch_index + 1}')
-            texts, themes = dataset
-            running_loss += self._batch_train(Texts(texts),
-                                              Themes(themes),
-                                              criterion,
-                                              optimizer)
+        num_of_batches = first_batch + len(dataloader)
+        for batch_index, dataset in enumerate(dataloader, first_batch):
+            self.LOGGER.debug(f'batch {batch_index + 1}')
+            if vectorized:
+                features, labels = dataset
+                running_loss += self._step(
+                    features, labels, criterion, optimizer)
+            else:
+                texts, themes = dataset
+                running_loss += self._batch_train(Texts(texts),
+                                                  Themes(themes),
+                                                  criterion,
+                                                  optimizer)
             if batch_index % log_loss_period == log_loss_period - 1:
                 self.LOGGER.info(
                     '[%d, %5d] loss: %.3f' %
                     (epoch, batch_index + 1, running_loss / log_loss_period))
                 running_loss = 0.0
+            if checkpoint is not None and (
+                    batch_index + 1 == num_of_batches
+                    or (batch_index + 1) % checkpoint_period == 0):
+                checkpoint(batch_index + 1)
 
+    @profiled('PreTrainedTextVecMlpClassifier._batch_train',
+              count_first_argument)
     def _batch_train(self, texts: Texts, themes: Themes, criterion, optimizer):
-        # zero the parameter grandients.
         text_vectors = self.vectorizer.transform(texts)
         features = text_vectors.as_torch_tensor()
+        labels = themes.as_torch_tensor()
+        return self._step(features, labels, criterion, optimizer)
+
+    def _step(self, features, labels, criterion, optimizer):
+        # zero the parameter grandients.
         optimizer.zero_grad()
-        outputs = self.classifier(features)
-        labels = themes.get_index()
-        loss = criterion(outputs, labels)
-        loss.backward()
-        optimizer.step()
+        with PROFILER.timer('train.forward', len(labels)):
+            outputs = self.classifier(features)
+            loss = criterion(outputs, labels)
+        with PROFILER.timer('train.backward', len(labels)):
+            loss.backward()
+        with PROFILER.timer('train.optimizer', len(labels)):
+            optimizer.step()
         return loss.item()
+
+    def predict(self, texts: Texts) -> np.ndarray:
+        """Return the indices of the themes that `texts` most likely have."""
+        features = self.vectorizer.transform(texts).as_torch_tensor()
+        self.classifier.eval()
+        with torch.no_grad():
+            outputs = self.classifier(features)
+        return outputs.argmax(dim=1).numpy()
+
+    def dump(self, filename: str):
+        """Write this object to a file."""
+        joblib.dump(self, filename)
+
+    @classmethod
+    def load(cls, filename: str):
+        """Load a :py:class:`PreTrainedTextVecMlpClassifier`."""
+        return joblib.load(filename)
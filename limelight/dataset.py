@@ -4,9 +4,14 @@ import os.path
 import re
 from dataclasses import dataclass
 from collections.abc import Sequence
-from typing import List, Callable
+from typing import Callable, Iterator, List, Optional
+import numpy as np
+import scipy.sparse as sp
+import torch
 import torch.utils.data as d
 from sklearn.model_selection import train_test_split
+from .archive import DocumentPack
+from .prefetch import Prefetcher
 from .theme import Theme
 from .types import T
 from .transformer import NopTransformer
@@ -39,14 +44,44 @@ class Dataset(d.Dataset, Sequence):
             return self.transformer(found)
         return Dataset(found, self.transformer)
 
+    def prefetch(self, read_ahead=64, max_workers=8) -> Iterator[T]:
+        """Iterate over the items in order, reading ahead on threads.
+
+        Parameters
+        ----------
+        read_ahead: int
+            The maximum number of items transformed before they are
+            consumed.
+
+        max_workers: int
+            The number of threads that transform sources.
+
+        """
+        return Prefetcher(read_ahead, max_workers).map(
+            self.transformer, self.sources)
+
     def update_transformer(self, transformer: Callable[[DataPointSource], T]):
         """Update :py:attr:`transformer`."""
         return Dataset(self.sources, transformer)
 
     @classmethod
     def create(cls, dirname: str, transformer=NopTransformer()):
-        """Create :py:class:`Dataset` from a directory."""
+        """Create :py:class:`Dataset` from a directory.
+
+        The directory is either the extracted archive or a
+        :py:class:`limelight.archive.DocumentPack`.
+
+        """
         abs_dirname = os.path.abspath(dirname)
+        pack = DocumentPack.open(abs_dirname)
+        if pack is not None:
+            return Dataset(DataPointSources(
+                [DataPointSource(abs_dirname,
+                                 DataPointMeta(DataPointId(point_id), theme),
+                                 int(size))
+                 for (theme, point_id), size in zip(pack.get_keys(),
+                                                    pack.sizes)]),
+                transformer)
         sources = DataPointSources(
             [data_point_meta for theme in Theme
              for data_point_meta in cls._load_ids(abs_dirname, theme)])
@@ -55,10 +90,12 @@ class Dataset(d.Dataset, Sequence):
     @classmethod
     def _load_ids(cls, dirname, theme: Theme) -> List[DataPointMeta]:
         theme_dir = os.path.join(dirname, theme.get_theme_name())
-        return [DataPointSource(dirname,
-                                DataPointMeta(DataPointId(point_id), theme))
-                for point_id in os.listdir(theme_dir)
-                if re.match(r'\d+', point_id)]
+        with os.scandir(theme_dir) as entries:
+            return [DataPointSource(dirname,
+                                    DataPointMeta(DataPointId(entry.name),
+                                                  theme),
+                                    entry.stat().st_size)
+                    for entry in entries if re.match(r'\d+', entry.name)]
 
     def save_sources_as_csv(self, filename) -> None:
         """Save :py:attr:`sources` as a CSV file."""
@@ -73,8 +110,157 @@ class Dataset(d.Dataset, Sequence):
         sources = DataPointSources.read_csv(filename)
         return Dataset(sources, transformer)
 
-    def train_test_split(self):
-        """Split dataset into train and test."""
-        train, test = train_test_split(self)
+    def train_test_split(self, random_state=None, groups=None):
+        """Split dataset into train and test.
+
+        Parameters
+        ----------
+        random_state: Optional[int]
+            Pass an int for reproducible splits.
+
+        groups: Optional[numpy.ndarray]
+            The group of each item. Items of a group go to the same side,
+            e.g. clusters of near-duplicates.
+
+        """
+        if groups is None:
+            train, test = train_test_split(self, random_state=random_state)
+        else:
+            train_groups, _ = train_test_split(np.unique(groups),
+                                               random_state=random_state)
+            in_train = np.isin(groups, train_groups)
+            train = [self.sources[i] for i in np.flatnonzero(in_train)]
+            test = [self.sources[i] for i in np.flatnonzero(~in_train)]
         return Dataset(DataPointSources(train), self.transformer), \
             Dataset(DataPointSources(test), self.transformer)
+
+    def select(self, indices) -> 'Dataset':
+        """Return the dataset of the items at `indices`."""
+        return Dataset(DataPointSources([self.sources[i] for i in indices]),
+                       self.transformer)
+
+
+class PairCollator:
+    """Collate pairs into a pair of lists for `torch.utils.data.DataLoader`.
+
+    The default collate function of `torch` cannot stack
+    :py:class:`greentea.text.Text` and :py:class:`Theme` objects.
+
+    """
+
+    def __call__(self, batch):
+        """Transpose a list of pairs."""
+        firsts, seconds = zip(*batch)
+        return list(firsts), list(seconds)
+
+
+class MatrixRowCollator:
+    """Collate row indices into a batch of a precomputed feature matrix.
+
+    A `torch.utils.data.DataLoader` over ``range(n_samples)`` with this
+    collate function emits pairs of dense feature tensors and label
+    tensors without vectorizing texts again.
+
+    Attributes
+    ----------
+    matrix
+        A dense or sparse matrix of shape (n_samples, n_features).
+
+    labels: numpy.ndarray
+        The indices of the themes.
+
+    """
+
+    def __init__(self, matrix, labels):
+        """Take a feature matrix and labels."""
+        self.matrix = matrix
+        self.labels = np.asarray(labels, dtype=np.int64)
+
+    def __call__(self, batch):
+        """Return the rows of `batch`."""
+        rows = self.matrix[batch]
+        if sp.issparse(rows):
+            rows = rows.toarray()
+        return torch.from_numpy(np.asarray(rows, dtype=np.float32)), \
+            torch.from_numpy(self.labels[batch])
+
+
+class BudgetBatchSampler(d.Sampler):
+    """Group indices into batches whose total length fits a budget.
+
+    Batches of similar total length take similar time to vectorize, even
+    though the lengths of documents vary by orders of magnitude. With
+    bucketing, each window of :py:attr:`bucket_size` shuffled documents
+    is sorted by length before it is cut into batches, so documents of
+    similar lengths share a batch. The order of batches is shuffled too.
+    Randomness comes from the global generator of `torch`, so seeding it
+    reproduces the batches. The batches of an epoch are drawn by the
+    first call of :py:meth:`__len__` or :py:meth:`__iter__`, and
+    :py:meth:`__iter__` uses them up.
+
+    Attributes
+    ----------
+    lengths: numpy.ndarray
+        The length of each item, e.g. the bytes that
+        :py:meth:`DataPointSources.get_sizes` returns.
+
+    budget: int
+        The maximum total length of a batch. An item longer than it is
+        a batch on its own.
+
+    bucket_size: int
+        The number of items sorted together. 0 disables bucketing.
+
+    shuffle: bool
+
+    """
+
+    def __init__(self, lengths, budget: int, bucket_size=0, shuffle=True):
+        """Take the lengths of items and the budget of a batch."""
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.budget = budget
+        self.bucket_size = bucket_size
+        self.shuffle = shuffle
+        self._batches: Optional[List[List[int]]] = None
+
+    def __len__(self) -> int:
+        """Return the number of the batches of the next epoch."""
+        if self._batches is None:
+            self._batches = self._draw()
+        return len(self._batches)
+
+    def __iter__(self) -> Iterator[List[int]]:
+        """Yield the indices of each batch."""
+        batches = self._draw() if self._batches is None else self._batches
+        self._batches = None
+        return iter(batches)
+
+    def _draw(self) -> List[List[int]]:
+        if self.shuffle:
+            order = torch.randperm(len(self.lengths)).numpy()
+        else:
+            order = np.arange(len(self.lengths))
+        if self.bucket_size > 0:
+            order = np.concatenate(
+                [bucket[np.argsort(self.lengths[bucket], kind='stable')]
+                 for bucket in np.array_split(
+                     order, max(-(-len(order) // self.bucket_size), 1))])
+        batches = self._cut(order)
+        if self.shuffle:
+            batches = [batches[i] for i in torch.randperm(len(batches))]
+        return batches
+
+    def _cut(self, order: np.ndarray) -> List[List[int]]:
+        batches = []
+        batch: List[int] = []
+        total = 0
+        for index, length in zip(order.tolist(),
+                                 self.lengths[order].tolist()):
+            if batch and total + length > self.budget:
+                batches.append(batch)
+                batch, total = [], 0
+            batch.append(index)
+            total += length
+        if batch:
+            batches.append(batch)
+        return batches
@@ -0,0 +1,274 @@
+"""Find near-duplicate documents with MinHash and locality sensitive hashing.
+
+References
+----------
+http://infolab.stanford.edu/~ullman/mmds/ch3.pdf
+
+"""
+import os
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Optional, Tuple
+import numpy as np
+from greentea.text import Text
+from .news import DataPointSources
+from .tokens import Tokenizer
+
+
+class MinHasher:
+    """Compute MinHash signatures of the sets of word shingles of texts.
+
+    The fraction of equal values of two signatures estimates the
+    Jaccard similarity of their sets of shingles.
+
+    """
+
+    # A prime larger than any 32-bit hash.
+    PRIME = 4294967311
+    MASK = 0xFFFFFFFF
+
+    def __init__(self, num_permutations=128, shingle_size=5, seed=0):
+        """Take the length of signatures and of shingles in words."""
+        self.num_permutations = num_permutations
+        self.shingle_size = shingle_size
+        random = np.random.default_rng(seed)
+        # a * hash + b stays below 2^64 with 32-bit operands.
+        self.a = random.integers(1, self.MASK, num_permutations,
+                                 dtype=np.uint64)
+        self.b = random.integers(0, self.MASK, num_permutations,
+                                 dtype=np.uint64)
+        self.tokenizer = Tokenizer()
+
+    def get_shingles(self, text: Text) -> np.ndarray:
+        """Return the 32-bit hashes of the word shingles of `text`."""
+        # crc32 is stable across processes, unlike `hash`.
+        tokens = np.fromiter((zlib.crc32(token.encode())
+                              for token in self.tokenizer(text)),
+                             dtype=np.uint64)
+        size = min(self.shingle_size, len(tokens))
+        if size == 0:
+            return np.zeros(1, dtype=np.uint64)
+        shingles = np.zeros(len(tokens) - size + 1, dtype=np.uint64)
+        for offset in range(size):
+            shingles = (shingles * np.uint64(31)
+                        + tokens[offset:len(tokens) - size + 1 + offset]) \
+                & np.uint64(self.MASK)
+        return np.unique(shingles)
+
+    def get_signature(self, text: Text) -> np.ndarray:
+        """Return the MinHash signature of `text`."""
+        shingles = self.get_shingles(text)
+        hashes = (self.a[:, None] * shingles[None, :] + self.b[:, None]) \
+            % np.uint64(self.PRIME)
+        return hashes.min(axis=1)
+
+
+class UnionFind:
+    """Disjoint sets of integers from 0 to `size` - 1."""
+
+    def __init__(self, size: int):
+        """Put each integer in its own set."""
+        self.parents = list(range(size))
+
+    def find(self, item: int) -> int:
+        """Return the representative of the set of `item`."""
+        root = item
+        while self.parents[root] != root:
+            root = self.parents[root]
+        while self.parents[item] != root:
+            self.parents[item], item = root, self.parents[item]
+        return root
+
+    def union(self, first: int, second: int) -> None:
+        """Merge the sets of `first` and `second`.
+
+        The smaller representative represents the merged set.
+
+        """
+        first_root = self.find(first)
+        second_root = self.find(second)
+        if first_root < second_root:
+            self.parents[second_root] = first_root
+        elif second_root < first_root:
+            self.parents[first_root] = second_root
+
+    def get_labels(self) -> np.ndarray:
+        """Return the representative of each integer."""
+        return np.asarray([self.find(item)
+                           for item in range(len(self.parents))],
+                          dtype=np.int64)
+
+
+@dataclass
+class DuplicateReport:
+    """How much near-duplicate removal shrinks a dataset.
+
+    Attributes
+    ----------
+    documents: int
+
+    clusters: int
+        The number of distinct documents up to near-duplicates.
+
+    bytes: int
+
+    removed_bytes: int
+        The bytes of all the documents but the representatives.
+
+    """
+
+    documents: int
+    clusters: int
+    bytes: int
+    removed_bytes: int
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'documents': self.documents,
+            'clusters': self.clusters,
+            'removed_documents': self.documents - self.clusters,
+            'bytes': self.bytes,
+            'removed_bytes': self.removed_bytes,
+            'removed_fraction': self.removed_bytes / max(self.bytes, 1)
+        }
+
+
+class Deduplicator:
+    """Cluster near-duplicate documents.
+
+    Signatures are computed on worker processes. Documents whose
+    signatures agree on all the rows of a band become candidates, and
+    candidates whose estimated Jaccard similarity is at least
+    :py:attr:`threshold` are merged into a cluster transitively.
+
+    """
+
+    LOGGER = getLogger(__name__)
+    # Members of buckets larger than this are compared with the
+    # representatives of the bucket instead of each other.
+    MAX_PAIRWISE = 64
+
+    def __init__(self,
+                 threshold=0.8,
+                 num_permutations=128,
+                 shingle_size=5,
+                 batch_size=256,
+                 max_workers: Optional[int] = None,
+                 seed=0):
+        """Take the Jaccard similarity of near-duplicates."""
+        self.threshold = threshold
+        self.min_hasher = MinHasher(num_permutations, shingle_size, seed)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.num_bands, self.num_rows = self.get_bands()
+
+    def get_bands(self) -> Tuple[int, int]:
+        """Return the number of bands and of rows of a band.
+
+        Pairs of similarity ``(1 / bands) ** (1 / rows)`` become
+        candidates with probability about 1/2. Candidates are verified,
+        so the most selective banding where that is at most
+        :py:attr:`threshold` is chosen, missing few near-duplicates.
+
+        """
+        num_permutations = self.min_hasher.num_permutations
+        rows = max(rows for rows in range(1, num_permutations + 1)
+                   if num_permutations % rows == 0
+                   and (rows / num_permutations) ** (1 / rows)
+                   <= self.threshold or rows == 1)
+        return num_permutations // rows, rows
+
+    def get_signatures(self, sources: DataPointSources) -> np.ndarray:
+        """Return the signature of each document of `sources`."""
+        batches = [sources[start:start + self.batch_size]
+                   for start in range(0, len(sources), self.batch_size)]
+        with ProcessPoolExecutor(self.max_workers or os.cpu_count()) \
+                as executor:
+            signatures = list(executor.map(
+                _sign, batches, [self.min_hasher] * len(batches)))
+        if not signatures:
+            return np.zeros((0, self.min_hasher.num_permutations),
+                            dtype=np.uint64)
+        return np.concatenate(signatures)
+
+    def cluster(self, sources: DataPointSources) -> np.ndarray:
+        """Return the smallest index of the cluster of each document."""
+        labels = self.cluster_signatures(self.get_signatures(sources))
+        self.LOGGER.info(f'found {len(np.unique(labels))} clusters '
+                         f'in {len(labels)} documents')
+        return labels
+
+    def cluster_signatures(self, signatures: np.ndarray) -> np.ndarray:
+        """Cluster documents by their signatures."""
+        clusters = UnionFind(len(signatures))
+        large_buckets = 0
+        for band in range(self.num_bands):
+            rows = signatures[:, band * self.num_rows:
+                              (band + 1) * self.num_rows]
+            buckets = defaultdict(list)
+            for index, key in enumerate(map(bytes, rows)):
+                buckets[key].append(index)
+            for members in buckets.values():
+                if len(members) > self.MAX_PAIRWISE:
+                    large_buckets += 1
+                    self._merge_representatives(signatures, members, clusters)
+                elif len(members) > 1:
+                    self._merge(signatures, members, clusters)
+        if large_buckets:
+            self.LOGGER.info(f'compared {large_buckets} buckets larger than '
+                             f'{self.MAX_PAIRWISE} with their representatives')
+        return clusters.get_labels()
+
+    def _merge(self, signatures, members, clusters: UnionFind):
+        block = signatures[np.asarray(members)]
+        similarity = (block[:, None, :] == block[None, :, :]).mean(axis=2)
+        for first, second in zip(*np.nonzero(np.triu(
+                similarity >= self.threshold, k=1))):
+            clusters.union(members[first], members[second])
+
+    def _merge_representatives(self, signatures, members,
+                               clusters: UnionFind):
+        # Each member joins every representative it is similar to, or
+        # becomes one. Near-duplicates are mostly similar to a
+        # representative, so this is linear in practice.
+        representatives = np.empty((len(members), signatures.shape[1]),
+                                   dtype=signatures.dtype)
+        indices = []
+        for member in members:
+            similarity = (representatives[:len(indices)]
+                          == signatures[member]).mean(axis=1)
+            similar = np.flatnonzero(similarity >= self.threshold)
+            for row in similar.tolist():
+                clusters.union(indices[row], member)
+            if len(similar) == 0:
+                representatives[len(indices)] = signatures[member]
+                indices.append(member)
+
+    @classmethod
+    def get_representatives(cls, labels: np.ndarray) -> np.ndarray:
+        """Return the sorted indices of the first document of each cluster."""
+        return np.sort(np.unique(labels, return_index=True)[1])
+
+    @classmethod
+    def report(cls,
+               sources: DataPointSources,
+               labels: np.ndarray) -> DuplicateReport:
+        """Return how much keeping only representatives removes."""
+        sizes = sources.get_sizes()
+        representatives = cls.get_representatives(labels)
+        return DuplicateReport(len(sources),
+                               len(representatives),
+                               int(sizes.sum()),
+                               int(sizes.sum() - sizes[representatives].sum()))
+
+
+def _sign(sources: DataPointSources, min_hasher: MinHasher) -> np.ndarray:
+    signatures = np.empty((len(sources), min_hasher.num_permutations),
+                          dtype=np.uint64)
+    for row, text in enumerate(sources.iter_texts()):
+        signatures[row] = min_hasher.get_signature(text)
+    return signatures
@@ -13,6 +13,7 @@ import tempfile
 import tarfile
 import requests
 import tqdm
+from .archive import DocumentPack
 
 
 class Downloader:
@@ -89,22 +90,30 @@ class Extractor:
 class Initializer:
     """Download and unarcihve 20newsgroups."""
 
-    def __init__(self, directory):
+    def __init__(self, directory, extract=True):
         """Take the path of a directory to place the dataset.
 
         Parameters
         ----------
         directory : str
 
+        extract : bool
+            Extract the files if `True`, and write a
+            :py:class:`limelight.archive.DocumentPack` otherwise.
+
         """
         self.directory = directory
+        self.extract = extract
 
     def prepare(self):
         """Put 20 newsgroups inside :py:attr:`directory`."""
         try:
             _, filename = tempfile.mkstemp('20')
             Downloader(filename).download()
-            Extractor(filename, self.directory).extract()
+            if self.extract:
+                Extractor(filename, self.directory).extract()
+            else:
+                DocumentPack.build(filename, self.directory)
         finally:
             self._delete_file(filename)
 
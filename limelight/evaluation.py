@@ -0,0 +1,146 @@
+"""Measure a trained model on a test dataset."""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from logging import getLogger
+from typing import Optional, Tuple
+import numpy as np
+import torch
+from .classifier import PreTrainedTextVecMlpClassifier
+from .news import DataPointSources
+from .theme import Theme
+
+
+class ConfusionMatrix:
+    """Count pairs of true and predicted themes incrementally.
+
+    Attributes
+    ----------
+    matrix: numpy.ndarray
+        ``matrix[i, j]`` is the number of documents of the theme whose
+        value is `i` that are predicted as the theme whose value is `j`.
+
+    """
+
+    def __init__(self, num_of_themes=Theme.num_of_themes()):
+        """Create an empty matrix."""
+        self.matrix = np.zeros((num_of_themes, num_of_themes),
+                               dtype=np.int64)
+
+    def update(self, labels: np.ndarray, predictions: np.ndarray):
+        """Add a batch of true labels and predictions."""
+        np.add.at(self.matrix, (labels, predictions), 1)
+
+    def get_total(self) -> int:
+        """Return the number of documents."""
+        return int(self.matrix.sum())
+
+    def get_accuracy(self) -> float:
+        """Return the fraction of correct predictions."""
+        return float(np.trace(self.matrix) / max(self.get_total(), 1))
+
+    def get_precision(self) -> np.ndarray:
+        """Return the precision of each theme."""
+        predicted = self.matrix.sum(axis=0)
+        return np.diag(self.matrix) / np.maximum(predicted, 1)
+
+    def get_recall(self) -> np.ndarray:
+        """Return the recall of each theme."""
+        actual = self.matrix.sum(axis=1)
+        return np.diag(self.matrix) / np.maximum(actual, 1)
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        precision = self.get_precision()
+        recall = self.get_recall()
+        return {
+            'accuracy': self.get_accuracy(),
+            'themes': {theme.get_theme_name(): {
+                'precision': float(precision[theme.value]),
+                'recall': float(recall[theme.value])} for theme in Theme},
+            'confusion_matrix': self.matrix.tolist()
+        }
+
+
+class Evaluator:
+    """Stream a test dataset through a model on worker processes.
+
+    Batches are submitted as workers free up, so only the confusion
+    matrix and a bounded number of pending batches are kept in memory.
+
+    """
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self,
+                 model: str,
+                 batch_size=256,
+                 max_workers: Optional[int] = None):
+        """Take the path to a model that `train` emitted.
+
+        Parameters
+        ----------
+        model: str
+
+        batch_size: int
+            The number of documents that a worker reads and classifies
+            at once.
+
+        max_workers: Optional[int]
+            The number of processes. All the CPUs by default.
+
+        """
+        self.model = model
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    def evaluate(self, sources: DataPointSources) -> dict:
+        """Return the metrics and the throughput on `sources`."""
+        confusion_matrix = ConfusionMatrix()
+        started = time.perf_counter()
+        max_workers = self.max_workers or os.cpu_count()
+        with ProcessPoolExecutor(max_workers,
+                                 initializer=_load_model,
+                                 initargs=(self.model,)) as executor:
+            max_pending = 2 * max_workers
+            pending = set()
+            for start in range(0, len(sources), self.batch_size):
+                if len(pending) >= max_pending:
+                    pending = self._collect(
+                        pending, confusion_matrix, FIRST_COMPLETED)
+                pending.add(executor.submit(
+                    _predict, sources[start:start + self.batch_size]))
+            self._collect(pending, confusion_matrix)
+        seconds = time.perf_counter() - started
+        report = confusion_matrix.return_as_dict()
+        report['documents'] = confusion_matrix.get_total()
+        report['seconds'] = seconds
+        report['documents_per_second'] = \
+            confusion_matrix.get_total() / seconds
+        return report
+
+    def _collect(self,
+                 pending: set,
+                 confusion_matrix: ConfusionMatrix,
+                 return_when='ALL_COMPLETED') -> set:
+        done, pending = wait(pending, return_when=return_when)
+        for future in done:
+            confusion_matrix.update(*future.result())
+        self.LOGGER.debug(f'evaluated {confusion_matrix.get_total()}')
+        return pending
+
+
+_MODEL: Optional[PreTrainedTextVecMlpClassifier] = None
+
+
+def _load_model(filename: str):
+    global _MODEL
+    # Workers run in parallel processes, so intra-op threads oversubscribe.
+    torch.set_num_threads(1)
+    _MODEL = PreTrainedTextVecMlpClassifier.load(filename)
+
+
+def _predict(sources: DataPointSources) -> Tuple[np.ndarray, np.ndarray]:
+    texts = sources.read_many()
+    labels = np.asarray([source.get_theme().value for source in sources])
+    return labels, _MODEL.predict(texts)
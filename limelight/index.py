@@ -0,0 +1,290 @@
+"""Expose an approximate nearest-neighbour index over text vectors.
+
+References
+----------
+Moses S. Charikar. 2002. Similarity estimation techniques from rounding
+algorithms.
+
+"""
+import hashlib
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import List, Optional
+import joblib
+import numpy as np
+import scipy.sparse as sp
+from greentea.text import Texts
+from .news import DataPointSource, DataPointSources
+from .vectorizer import Vectorizer
+
+
+@dataclass
+class Neighbour:
+    """A document found by :py:class:`SimilarDocumentIndex`.
+
+    Attributes
+    ----------
+    source: DataPointSource
+
+    similarity: float
+        The cosine similarity to the query.
+
+    """
+
+    source: DataPointSource
+    similarity: float
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        dict_value = self.source.return_as_dict()
+        dict_value['similarity'] = self.similarity
+        return dict_value
+
+
+@dataclass
+class IndexBenchmark:
+    """Recall and latency of approximate search against exact search.
+
+    Attributes
+    ----------
+    recall: float
+        Mean fraction of the exact top-k found by the approximate search.
+
+    approximate_seconds: float
+
+    exact_seconds: float
+
+    mean_candidates: float
+        Mean number of documents scored per query.
+
+    """
+
+    recall: float
+    approximate_seconds: float
+    exact_seconds: float
+    mean_candidates: float
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'recall': self.recall,
+            'approximate_seconds': self.approximate_seconds,
+            'exact_seconds': self.exact_seconds,
+            'mean_candidates': self.mean_candidates
+        }
+
+
+class SimilarDocumentIndex:
+    """Random-hyperplane LSH over the vectors of a fitted vectorizer.
+
+    Each of :py:attr:`num_tables` hash tables maps the signs of
+    :py:attr:`num_bits` random projections to the rows that share them.
+    A query scores only the rows that collide with it in some table.
+
+    """
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self,
+                 vectorizer: Vectorizer,
+                 num_bits=16,
+                 num_tables=8,
+                 seed=0,
+                 vectorizer_digest: Optional[str] = None):
+        """Take a fitted :py:class:`Vectorizer`.
+
+        Parameters
+        ----------
+        vectorizer: Vectorizer
+
+        num_bits: int
+            The number of hyperplanes per table.
+
+        num_tables: int
+
+        seed: int
+            The seed of the random hyperplanes.
+
+        vectorizer_digest: Optional[str]
+            What :py:meth:`get_digest` returns for the file of
+            `vectorizer`, to check the file given to update the index.
+
+        """
+        if num_bits > 63:
+            raise ValueError(f'{num_bits} bits do not fit in int64 codes')
+        self.vectorizer = vectorizer
+        self.num_bits = num_bits
+        self.num_tables = num_tables
+        self.seed = seed
+        self.vectorizer_digest = vectorizer_digest
+        self.hyperplanes = None
+        self.sources: List[DataPointSource] = []
+        self.blocks = []
+        self.tables = [dict() for _ in range(num_tables)]
+
+    def __len__(self) -> int:
+        """Return the number of indexed documents."""
+        return len(self.sources)
+
+    @classmethod
+    def get_digest(cls, filename: str) -> str:
+        """Return the digest of the file of a vectorizer."""
+        with open(filename, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def check_vectorizer(self, filename: str) -> None:
+        """Check that :py:attr:`vectorizer` was loaded from `filename`.
+
+        Indices that do not know their vectorizer files pass.
+
+        Raises
+        ------
+        ValueError
+            If the vectorizer of this index is another one.
+
+        """
+        expected = getattr(self, 'vectorizer_digest', None)
+        if expected is not None and self.get_digest(filename) != expected:
+            raise ValueError(
+                f'{filename} is not the vectorizer of the index.')
+
+    def add(self, sources: DataPointSources, batch_size=1000):
+        """Insert `sources` into the index.
+
+        Parameters
+        ----------
+        sources: DataPointSources
+
+        batch_size: int
+            The number of documents vectorized at once.
+
+        """
+        for start in range(0, len(sources), batch_size):
+            batch = sources[start:start + batch_size]
+            vectors = self._vectorize(batch.read_many())
+            self._add_vectors(list(batch), vectors)
+            self.LOGGER.debug(f'indexed {len(self)} documents')
+        return self
+
+    def _add_vectors(self, sources: List[DataPointSource], vectors):
+        first_row = len(self.sources)
+        codes = self._hash(vectors)
+        for table, table_codes in zip(self.tables, codes.T):
+            for row, code in enumerate(table_codes.tolist(), first_row):
+                table.setdefault(code, []).append(row)
+        self.sources.extend(sources)
+        self.blocks.append(vectors)
+
+    def _get_vectors(self):
+        if len(self.blocks) > 1:
+            self.blocks = [sp.vstack(self.blocks, format='csr')]
+        return self.blocks[0]
+
+    def query(self, texts: Texts, k=10) -> List[List[Neighbour]]:
+        """Find the `k` most similar documents for each of `texts`."""
+        return [self._to_neighbours(rows, similarities)
+                for rows, similarities
+                in self._approximate_search(self._vectorize(texts), k)[0]]
+
+    def exact_query(self, texts: Texts, k=10) -> List[List[Neighbour]]:
+        """Find the `k` most similar documents by brute force."""
+        return [self._to_neighbours(rows, similarities)
+                for rows, similarities
+                in self._exact_search(self._vectorize(texts), k)]
+
+    def benchmark(self, texts: Texts, k=10) -> IndexBenchmark:
+        """Compare :py:meth:`query` with :py:meth:`exact_query` on `texts`."""
+        vectors = self._vectorize(texts)
+        started = time.perf_counter()
+        approximate, num_candidates = self._approximate_search(vectors, k)
+        approximate_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        exact = self._exact_search(vectors, k)
+        exact_seconds = time.perf_counter() - started
+        recalls = [len(set(found.tolist()) & set(expected.tolist()))
+                   / max(len(expected), 1)
+                   for (found, _), (expected, _) in zip(approximate, exact)]
+        return IndexBenchmark(float(np.mean(recalls)),
+                              approximate_seconds,
+                              exact_seconds,
+                              float(np.mean(num_candidates)))
+
+    def _approximate_search(self, vectors, k):
+        results = []
+        num_candidates = []
+        codes = self._hash(vectors)
+        for query_index, query_codes in enumerate(codes):
+            candidates = self._candidates(query_codes)
+            num_candidates.append(len(candidates))
+            results.append(
+                self._top_k(vectors[query_index], candidates, k))
+        return results, num_candidates
+
+    def _candidates(self, query_codes) -> np.ndarray:
+        buckets = [table.get(code, [])
+                   for table, code in zip(self.tables, query_codes.tolist())]
+        if not any(buckets):
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(
+            [np.asarray(bucket, dtype=np.int64) for bucket in buckets]))
+
+    def _exact_search(self, vectors, k):
+        if not self.blocks:
+            return [(np.empty(0, dtype=np.int64), np.empty(0))
+                    for _ in range(vectors.shape[0])]
+        similarities = (vectors @ self._get_vectors().T).toarray()
+        return [self._select(np.arange(len(self)), row, k)
+                for row in similarities]
+
+    def _top_k(self, vector, candidates: np.ndarray, k):
+        if len(candidates) == 0:
+            return candidates, np.empty(0)
+        indexed = self._get_vectors()[candidates]
+        similarities = (indexed @ vector.T).toarray()[:, 0]
+        return self._select(candidates, similarities, k)
+
+    @staticmethod
+    def _select(rows: np.ndarray, similarities: np.ndarray, k):
+        if len(rows) > k:
+            top = np.argpartition(-similarities, k - 1)[:k]
+            rows, similarities = rows[top], similarities[top]
+        order = np.argsort(-similarities, kind='stable')
+        return rows[order], similarities[order]
+
+    def _to_neighbours(self, rows, similarities) -> List[Neighbour]:
+        return [Neighbour(self.sources[row], float(similarity))
+                for row, similarity in zip(rows.tolist(),
+                                           similarities.tolist())]
+
+    def _vectorize(self, texts: Texts):
+        vectors = sp.csr_matrix(
+            self.vectorizer.transform(texts).raw(), dtype=np.float32)
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)))
+        norms[norms == 0] = 1
+        return sp.csr_matrix(vectors.multiply(1 / norms))
+
+    def _hash(self, vectors) -> np.ndarray:
+        """Return int64 codes of shape (n_samples, num_tables)."""
+        hyperplanes = self._get_hyperplanes(vectors.shape[1])
+        signs = np.asarray(vectors @ hyperplanes) > 0
+        signs = signs.reshape(-1, self.num_tables, self.num_bits)
+        weights = np.left_shift(1, np.arange(self.num_bits, dtype=np.int64))
+        return signs.astype(np.int64) @ weights
+
+    def _get_hyperplanes(self, num_features: int) -> np.ndarray:
+        if self.hyperplanes is None:
+            random = np.random.default_rng(self.seed)
+            self.hyperplanes = random.standard_normal(
+                (num_features, self.num_tables * self.num_bits),
+                dtype=np.float32)
+        return self.hyperplanes
+
+    def dump(self, filename: str):
+        """Write this object to a file."""
+        joblib.dump(self, filename)
+
+    @classmethod
+    def load(cls, filename: str):
+        """Load a :py:class:`SimilarDocumentIndex` from `filename`."""
+        return joblib.load(filename)
@@ -0,0 +1,88 @@
+"""Export classifiers as frozen TorchScript graphs for inference."""
+import copy
+import warnings
+from typing import List
+import torch
+import torch.nn as nn
+from .benchmark import Benchmark, BenchmarkResult
+from .classifier import EmbeddingBagClassifier
+
+
+def freeze(classifier: nn.Module) -> torch.jit.ScriptModule:
+    """Return a frozen TorchScript graph of `classifier` in eval mode.
+
+    Freezing inlines the parameters and drops dropout, and
+    `torch.jit.optimize_for_inference` fuses the operators that the
+    backend supports, e.g. linear layers and their activations.
+    The graph is loadable with `torch.jit.load` without `limelight`.
+    `classifier` itself is left in its mode.
+
+    """
+    classifier = copy.deepcopy(classifier).eval()
+    with warnings.catch_warnings():
+        # TorchScript is deprecated in favour of `torch.export`, which
+        # neither freezes nor fuses.
+        warnings.simplefilter('ignore', FutureWarning)
+        scripted = torch.jit.script(classifier)
+        return torch.jit.optimize_for_inference(torch.jit.freeze(scripted))
+
+
+def export(classifier: nn.Module, filename: str) -> None:
+    """Write the graph of :py:func:`freeze` to `filename`."""
+    freeze(classifier).save(filename)
+
+
+def create_example_input(classifier: nn.Module, batch_size: int,
+                         document_length=200):
+    """Return a random batch that `classifier` takes.
+
+    Parameters
+    ----------
+    classifier: nn.Module
+        :py:class:`limelight.classifier.MlpClassifier` or
+        :py:class:`limelight.classifier.EmbeddingBagClassifier`.
+
+    batch_size: int
+
+    document_length: int
+        The number of token ids of a document for
+        :py:class:`limelight.classifier.EmbeddingBagClassifier`.
+
+    """
+    if isinstance(classifier, EmbeddingBagClassifier):
+        token_ids = torch.randint(classifier.embedding.num_embeddings,
+                                  (batch_size * document_length,))
+        offsets = torch.arange(0, batch_size * document_length,
+                               document_length)
+        return token_ids, offsets
+    return torch.rand(batch_size, classifier.fc0.in_features)
+
+
+def measure_latency(classifier: nn.Module,
+                    frozen: torch.jit.ScriptModule,
+                    batch_sizes: List[int],
+                    warmup=3,
+                    repeat=20) -> List[BenchmarkResult]:
+    """Time the eager `classifier` and `frozen` on each batch size.
+
+    The names of the results are ``eager/<batch size>`` and
+    ``frozen/<batch size>``.
+
+    """
+    training = classifier.training
+    classifier.eval()
+    results = []
+    try:
+        for batch_size in batch_sizes:
+            example = create_example_input(classifier, batch_size)
+            for name, module in [('eager', classifier), ('frozen', frozen)]:
+                def infer(module=module):
+                    with torch.inference_mode():
+                        module(example)
+
+                results.append(Benchmark(f'{name}/{batch_size}',
+                                         infer,
+                                         batch_size).run(warmup, repeat))
+    finally:
+        classifier.train(training)
+    return results
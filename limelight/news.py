@@ -3,9 +3,13 @@ import codecs
 import os
 import csv
 from dataclasses import dataclass
-from typing import List, Callable
-from greentea.text import Text
+from typing import Callable, Iterator, List, Optional
+import numpy as np
+from greentea.text import Text, Texts
 from greentea.first_class_collection import FirstClassSequence
+from .archive import DocumentPack
+from .prefetch import Prefetcher
+from .profiling import profiled
 from .theme import Theme
 from .types import T
 
@@ -77,30 +81,63 @@ class DataPointSource:
 
     data_point_meta: DataPointMeta
 
+    size: Optional[int]
+        The number of bytes of the text if known.
+
     """
 
     directory: str
     data_point_meta: DataPointMeta
+    size: Optional[int] = None
 
+    @profiled('DataPointSource.read_text')
     def read_text(self) -> Text:
-        """Read a text from a file."""
+        """Read a text from a file, or from a pack in :py:attr:`directory`.
+
+        See :py:class:`limelight.archive.DocumentPack`.
+
+        """
+        pack = DocumentPack.open(self.directory)
+        if pack is not None:
+            document = pack.read(self.get_theme(),
+                                 self.data_point_meta.datapoint_id.get_raw())
+            return Text(document.decode('utf-8', errors='ignore'))
+        with codecs.open(self.get_path(), encoding='utf-8',
+                         errors='ignore') as f:
+            return Text(f.read())
+
+    def get_path(self) -> str:
+        """Return the path to the file of the text."""
         point_id = self.data_point_meta.get_id_str()
         theme = self.data_point_meta.get_theme_name()
-        path = os.path.join(self.directory, theme, point_id)
-        with codecs.open(path, encoding='utf-8', errors='ignore') as f:
-            return Text(f.read())
+        return os.path.join(self.directory, theme, point_id)
+
+    def get_size(self) -> int:
+        """Return :py:attr:`size`, looking up the file if it is unknown."""
+        if self.size is not None:
+            return self.size
+        pack = DocumentPack.open(self.directory)
+        if pack is not None:
+            return pack.get_size(self.get_theme(),
+                                 self.data_point_meta.datapoint_id.get_raw())
+        return os.path.getsize(self.get_path())
 
     def return_as_dict(self) -> dict:
         """Return a dict the represents this object."""
         dict_value = self.data_point_meta.return_as_dict()
         dict_value['directory'] = self.directory
+        if self.size is not None:
+            dict_value['size'] = self.size
         return dict_value
 
     @classmethod
     def from_dict(cls, source: dict):
         """Create :py:class:`DataPointSource` from a dict value."""
         meta = DataPointMeta.from_dict(source)
-        return DataPointSource(source['directory'], meta)
+        size = source.get('size')
+        return DataPointSource(source['directory'],
+                               meta,
+                               int(size) if size else None)
 
     def get_theme(self) -> Theme:
         """Return the theme.
@@ -130,6 +167,44 @@ class DataPointSources(FirstClassSequence):
         """Return :py:attr:`items`."""
         return self.items
 
+    def iter_texts(self, read_ahead=64, max_workers=8) -> Iterator[Text]:
+        """Yield the texts in order, reading ahead on threads.
+
+        Texts are read while the consumer processes the texts already
+        read, and at most `read_ahead` of them are held at once.
+
+        Parameters
+        ----------
+        read_ahead: int
+            The maximum number of files read before they are consumed.
+
+        max_workers: int
+            The number of threads that read files.
+
+        """
+        return Prefetcher(read_ahead, max_workers).map(
+            DataPointSource.read_text, self.items)
+
+    def read_many(self, read_ahead=64, max_workers=8) -> Texts:
+        """Read all the texts in order, reading ahead on threads.
+
+        The texts are returned once all of them are read, as `Texts` is
+        a sequence that callers index, slice and pass over more than
+        once. Consumers that pass over texts once should take
+        :py:meth:`iter_texts` instead, so that reading overlaps with
+        their work.
+
+        Parameters
+        ----------
+        read_ahead: int
+            The maximum number of files read before they are consumed.
+
+        max_workers: int
+            The number of threads that read files.
+
+        """
+        return Texts(list(self.iter_texts(read_ahead, max_workers)))
+
     def save_csv(self, filename) -> None:
         """Write them in csv format."""
         with open(filename, 'w') as csvfile:
@@ -145,13 +220,21 @@ class DataPointSources(FirstClassSequence):
 
     @classmethod
     def read_csv(cls, filename: str):
-        """Read a file from `filename` into :py:class:`DataPointSources`."""
+        """Read a file from `filename` into :py:class:`DataPointSources`.
+
+        The ``size`` column is optional.
+
+        """
         with open(filename) as csvfile:
-            reader = csv.DictReader(csvfile, fieldnames=cls._fieldnames())
-            next(reader)
+            reader = csv.DictReader(csvfile)
             return DataPointSources(
                 [DataPointSource.from_dict(record) for record in reader])
 
+    def get_sizes(self) -> np.ndarray:
+        """Return the number of bytes of each text."""
+        return np.asarray([source.get_size() for source in self.items],
+                          dtype=np.int64)
+
     @classmethod
     def _fieldnames(cls):
-        return ['directory', 'theme', 'id']
+        return ['directory', 'theme', 'id', 'size']
@@ -0,0 +1,199 @@
+"""Strip the parts of Usenet messages that are mostly noise.
+
+A message is a block of header fields, a blank line and a body. Bodies
+quote the messages they reply to and often end with a signature.
+
+"""
+import json
+import os
+import os.path
+import re
+from typing import Iterable, List, Optional, Tuple
+from greentea.text import Text
+from .archive import DocumentPack
+from .news import DataPointSource, DataPointSources
+from .prefetch import Prefetcher
+from .profiling import profiled
+from .tokens import Tokenizer
+
+
+class MessageNormalizer:
+    """Drop headers, quoted lines and signatures of a message in one pass.
+
+    Attributes
+    ----------
+    headers: bool
+        Keep all the header fields if `True`.
+
+    header_fields: frozenset
+        The lowercased names of the fields kept when :py:attr:`headers`
+        is `False`, e.g. ``subject``.
+
+    quotes: bool
+        Keep quoted lines and the lines that introduce them if `True`.
+
+    signatures: bool
+        Keep signatures if `True`.
+
+    max_tokens: Optional[int]
+        Truncate the result to this number of tokens of
+        :py:class:`limelight.tokens.Tokenizer` if given.
+
+    """
+
+    FIELD = re.compile(r'[!-9;-~]+:')
+    # The same lines as `sklearn.datasets.fetch_20newsgroups` strips.
+    QUOTE = re.compile(r'(writes in|writes:|wrote:|says:|said:'
+                       r'|^In article|^Quoted from|^\||^>)')
+    SIGNATURE = re.compile(r'--+ ?')
+    # A longer tail after a delimiter is not a signature.
+    MAX_SIGNATURE_LINES = 10
+    # The file that records the normalizer of a pack.
+    CONFIGURATION = 'normalizer.json'
+
+    def __init__(self,
+                 headers=False,
+                 header_fields: Iterable[str] = (),
+                 quotes=False,
+                 signatures=False,
+                 max_tokens: Optional[int] = None):
+        """Take what to keep."""
+        self.headers = headers
+        self.header_fields = frozenset(field.lower()
+                                       for field in header_fields)
+        self.quotes = quotes
+        self.signatures = signatures
+        self.max_tokens = max_tokens
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'headers': self.headers,
+            'header_fields': sorted(self.header_fields),
+            'quotes': self.quotes,
+            'signatures': self.signatures,
+            'max_tokens': self.max_tokens
+        }
+
+    @classmethod
+    def from_dict(cls, source: dict):
+        """Create :py:class:`MessageNormalizer` from a dict value."""
+        return MessageNormalizer(source['headers'],
+                                 source['header_fields'],
+                                 source['quotes'],
+                                 source['signatures'],
+                                 source['max_tokens'])
+
+    @profiled('MessageNormalizer.__call__')
+    def __call__(self, text: Text) -> Text:
+        """Return the normalized text.
+
+        Lines are visited once, and the rest of a message is skipped
+        once :py:attr:`max_tokens` is reached.
+
+        """
+        lines = text.text.split('\n')
+        start, header = self._get_header(lines)
+        kept = []
+        counts = []
+        total = 0
+        signature: Optional[int] = None
+        for number, line in enumerate(header + lines[start:]):
+            if number >= len(header):
+                if not self.quotes and self.QUOTE.search(line):
+                    continue
+                if not self.signatures and self.SIGNATURE.fullmatch(line):
+                    signature = len(kept)
+            if self.max_tokens is not None:
+                total += len(Tokenizer.PATTERN.findall(line))
+            kept.append(line)
+            counts.append(total)
+            if signature is not None \
+                    and len(kept) - signature > self.MAX_SIGNATURE_LINES:
+                signature = None
+            # Tokens of a possible signature do not count yet.
+            body = total if signature is None or signature == 0 \
+                else counts[signature - 1]
+            if self.max_tokens is not None and body >= self.max_tokens:
+                break
+        if signature is not None:
+            while signature > 0 and not kept[signature - 1].strip():
+                signature -= 1
+            del kept[signature:]
+            del counts[signature:]
+        return Text('\n'.join(self._truncate(kept, counts)))
+
+    def write(self,
+              sources: DataPointSources,
+              directory: str,
+              level=6) -> DataPointSources:
+        """Pack the normalized texts of `sources` into `directory`.
+
+        See :py:class:`limelight.archive.DocumentPack`. This object is
+        recorded in :py:attr:`CONFIGURATION` in `directory`.
+
+        Returns
+        -------
+        DataPointSources
+            The normalized texts, in the same order as `sources`.
+
+        Raises
+        ------
+        ValueError
+            If `sources` are read from `directory`.
+
+        """
+        target = os.path.realpath(directory)
+        if any(os.path.realpath(source.directory) == target
+               for source in sources):
+            raise ValueError(
+                f'{directory} cannot be both read and written.')
+
+        def normalize(source: DataPointSource):
+            return self(source.read_text()).text.encode('utf-8')
+
+        documents = Prefetcher().map(normalize, sources)
+        pack = DocumentPack.write(
+            directory,
+            ((source.get_theme(),
+              source.data_point_meta.datapoint_id.get_raw(),
+              document)
+             for source, document in zip(sources, documents)),
+            level)
+        configuration = os.path.join(directory, self.CONFIGURATION)
+        with open(f'{configuration}.tmp', 'w') as f:
+            json.dump(self.return_as_dict(), f)
+        os.replace(f'{configuration}.tmp', configuration)
+        return DataPointSources(
+            [DataPointSource(directory, meta, pack.get_size(
+                meta.theme, meta.datapoint_id.get_raw()))
+             for meta in (source.data_point_meta for source in sources)])
+
+    def _get_header(self, lines) -> Tuple[int, List[str]]:
+        # Return where the body starts and the kept header lines.
+        if not lines or not self.FIELD.match(lines[0]):
+            return 0, []
+        header = []
+        keep = False
+        for number, line in enumerate(lines):
+            if not line.strip():
+                # Keep the blank line that ends the kept fields.
+                return number + 1, header + [line] if header else []
+            if not line[0].isspace():
+                name = line.split(':', 1)[0].lower()
+                keep = self.headers or name in self.header_fields
+            if keep:
+                header.append(line)
+        return len(lines), header
+
+    def _truncate(self, kept, counts):
+        if self.max_tokens is None or not counts \
+                or counts[-1] <= self.max_tokens:
+            return kept
+        last = next(number for number, count in enumerate(counts)
+                    if count >= self.max_tokens)
+        previous = counts[last - 1] if last > 0 else 0
+        tokens = list(Tokenizer.PATTERN.finditer(kept[last]))
+        end = tokens[self.max_tokens - previous - 1].end() \
+            if self.max_tokens > previous else 0
+        return kept[:last] + [kept[last][:end]]
@@ -0,0 +1,284 @@
+"""Run the subcommands from `split` to `train` in one process."""
+import os
+import os.path
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Optional, Tuple
+import torch.utils.data as tud
+from greentea.text import Texts
+from .cache import ArtifactCache, Fingerprint, run_cached
+from .classifier import MlpClassifier, PreTrainedTextVecMlpClassifier
+from .dataset import Dataset, MatrixRowCollator
+from .news import DataPointSources
+from .theme import Theme, Themes
+from .vector import TextVectors
+from .vectorizer import \
+    TfidfVectorizer, \
+    FeatureSelectedVectorizer, \
+    LogisticRegressionFsVectorizer
+
+
+@dataclass
+class Corpus:
+    """Texts and themes read from :py:class:`DataPointSources` at once.
+
+    Attributes
+    ----------
+    texts: Texts
+
+    themes: Themes
+
+    """
+
+    texts: Texts
+    themes: Themes
+
+    @classmethod
+    def read(cls, sources: DataPointSources):
+        """Read the texts of `sources`."""
+        return Corpus(sources.read_many(),
+                      Themes([source.get_theme() for source in sources]))
+
+
+@dataclass
+class PipelineArtifacts:
+    """The files that :py:class:`Pipeline` writes into :py:attr:`directory`.
+
+    They are the same files as the subcommands emit.
+
+    """
+
+    directory: str
+
+    def get_train(self) -> str:
+        """Return the path to the train CSV file."""
+        return os.path.join(self.directory, 'train.csv')
+
+    def get_test(self) -> str:
+        """Return the path to the test CSV file."""
+        return os.path.join(self.directory, 'test.csv')
+
+    def get_sparse_vectorizer(self) -> str:
+        """Return the path to the vectorizer of `sparsevec`."""
+        return os.path.join(self.directory, 'sparsevec')
+
+    def get_feature_selected_vectorizer(self) -> str:
+        """Return the path to the vectorizer of `featuresel`."""
+        return os.path.join(self.directory, 'featuresel')
+
+    def get_model(self) -> str:
+        """Return the path to the model of `train`."""
+        return os.path.join(self.directory, 'model')
+
+
+def create_sparsevec_fingerprint(train: str,
+                                 tokens: Optional[str] = None,
+                                 min_df=1,
+                                 max_df=1.0,
+                                 ngram=1,
+                                 hash_bits: Optional[int] = None) \
+        -> Fingerprint:
+    """Return the fingerprint of the inputs of `sparsevec`."""
+    fingerprint = Fingerprint('sparsevec').add_manifest(train)
+    if tokens is not None:
+        fingerprint.add_file(tokens)
+    return fingerprint.add_value(
+        'parameters', [min_df, max_df, ngram, tokens is None, hash_bits])
+
+
+def create_featuresel_fingerprint(train: str,
+                                  vectorizer: str,
+                                  max_features: int,
+                                  tokens: Optional[str] = None) \
+        -> Fingerprint:
+    """Return the fingerprint of the inputs of `featuresel`."""
+    fingerprint = Fingerprint('featuresel') \
+        .add_manifest(train) \
+        .add_file(vectorizer)
+    if tokens is not None:
+        fingerprint.add_file(tokens)
+    return fingerprint.add_value('max_features', max_features)
+
+
+def create_train_fingerprint(vectorizer: str,
+                             train: str,
+                             parameters: list) -> Fingerprint:
+    """Return the fingerprint of the inputs of `train`."""
+    return Fingerprint('train') \
+        .add_file(vectorizer) \
+        .add_manifest(train) \
+        .add_value('parameters', parameters)
+
+
+def create_update_fingerprint(model: str,
+                              sources: str,
+                              parameters: list) -> Fingerprint:
+    """Return the fingerprint of the inputs of `update`."""
+    return Fingerprint('update') \
+        .add_file(model) \
+        .add_manifest(sources) \
+        .add_value('parameters', parameters)
+
+
+class Pipeline:
+    """Split, vectorize, select features and train sharing the corpus.
+
+    Documents are read once, and the TF-IDF matrix of the train dataset
+    is computed once and reused for feature selection and training.
+    With a :py:class:`ArtifactCache`, stages whose inputs have not
+    changed restore their artifacts instead, and documents are not read
+    unless a stage needs them.
+
+    """
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self,
+                 directory: str,
+                 max_features=20000,
+                 epochs=10,
+                 batch_size=32,
+                 learning_rate=1e-3,
+                 units=64,
+                 dropout_rate=0.2,
+                 seed: Optional[int] = None,
+                 cache: Optional[ArtifactCache] = None):
+        """Take the directory to write artifacts and the parameters."""
+        self.artifacts = PipelineArtifacts(directory)
+        self.max_features = max_features
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.learning_rate = learning_rate
+        self.units = units
+        self.dropout_rate = dropout_rate
+        self.seed = seed
+        self.cache = cache
+
+    def run(self, dataset: Dataset) -> PreTrainedTextVecMlpClassifier:
+        """Run all the stages on `dataset`, returning the trained model."""
+        os.makedirs(self.artifacts.directory, exist_ok=True)
+        if self.cache is not None and self.seed is None:
+            self.LOGGER.warning(
+                'the split is random without a seed, so no stage can be '
+                'restored from the cache')
+        train_dataset, _ = self.split(dataset)
+        state = _TrainState(train_dataset.sources)
+        vectorizer = self.sparsevec(state)
+        feature_selected_vectorizer = self.featuresel(vectorizer, state)
+        return self.train(feature_selected_vectorizer, state)
+
+    def split(self, dataset: Dataset) -> Tuple[Dataset, Dataset]:
+        """Do what the `split` subcommand does."""
+        train_dataset, test_dataset = dataset.train_test_split(self.seed)
+        train_dataset.save_sources_as_csv(self.artifacts.get_train())
+        test_dataset.save_sources_as_csv(self.artifacts.get_test())
+        return train_dataset, test_dataset
+
+    def sparsevec(self, state: '_TrainState') -> TfidfVectorizer:
+        """Do what the `sparsevec` subcommand does."""
+        location = self.artifacts.get_sparse_vectorizer()
+
+        def compute():
+            vectorizer = TfidfVectorizer()
+            # The vectors are reused unless a later stage is cached.
+            state.vectors = vectorizer.fit_transform(state.get_corpus().texts)
+            vectorizer.dump(location)
+            state.vectorizer = vectorizer
+
+        if run_cached(
+                self.cache,
+                lambda: create_sparsevec_fingerprint(
+                    self.artifacts.get_train()),
+                location,
+                compute):
+            state.vectorizer = TfidfVectorizer.load(location)
+        return state.vectorizer
+
+    def featuresel(self,
+                   vectorizer: TfidfVectorizer,
+                   state: '_TrainState') -> FeatureSelectedVectorizer:
+        """Do what the `featuresel` subcommand does on shared vectors."""
+        location = self.artifacts.get_feature_selected_vectorizer()
+        feature_selected_vectorizer = LogisticRegressionFsVectorizer.create(
+            vectorizer, self.max_features)
+
+        def compute():
+            feature_selected_vectorizer.fit_vectors(
+                state.get_vectors(), state.get_corpus().themes)
+            feature_selected_vectorizer.dump(location)
+
+        if run_cached(
+                self.cache,
+                lambda: create_featuresel_fingerprint(
+                    self.artifacts.get_train(),
+                    self.artifacts.get_sparse_vectorizer(),
+                    self.max_features),
+                location,
+                compute):
+            return LogisticRegressionFsVectorizer.load(location)
+        return feature_selected_vectorizer
+
+    def train(self,
+              vectorizer: FeatureSelectedVectorizer,
+              state: '_TrainState') -> PreTrainedTextVecMlpClassifier:
+        """Do what the `train` subcommand does on shared vectors."""
+        location = self.artifacts.get_model()
+        model = PreTrainedTextVecMlpClassifier(
+            vectorizer,
+            MlpClassifier(vectorizer.get_num_of_features(),
+                          Theme.num_of_themes(),
+                          self.units,
+                          self.dropout_rate))
+
+        def compute():
+            collator = MatrixRowCollator(
+                vectorizer.select_vectors(state.get_vectors()),
+                state.get_corpus().themes.get_index())
+            dataloader = tud.DataLoader(range(len(state.sources)),
+                                        batch_size=self.batch_size,
+                                        shuffle=True,
+                                        collate_fn=collator)
+            model.train(dataloader,
+                        self.epochs,
+                        self.learning_rate,
+                        vectorized=True)
+            model.dump(location)
+
+        if run_cached(
+                self.cache,
+                lambda: create_train_fingerprint(
+                    self.artifacts.get_feature_selected_vectorizer(),
+                    self.artifacts.get_train(),
+                    [self.epochs,
+                     self.batch_size,
+                     self.learning_rate,
+                     self.units,
+                     self.dropout_rate]),
+                location,
+                compute):
+            return PreTrainedTextVecMlpClassifier.load(location)
+        return model
+
+
+class _TrainState:
+    """Read the train corpus and vectorize it at most once."""
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self, sources: DataPointSources):
+        self.sources = sources
+        self.vectorizer = None
+        self.corpus = None
+        self.vectors = None
+
+    def get_corpus(self) -> Corpus:
+        if self.corpus is None:
+            self.corpus = Corpus.read(self.sources)
+            self.LOGGER.info(f'read {len(self.sources)} documents')
+        return self.corpus
+
+    def get_vectors(self) -> TextVectors:
+        if self.vectors is None:
+            self.vectors = self.vectorizer.transform(
+                self.get_corpus().texts)
+        return self.vectors
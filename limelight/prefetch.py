@@ -0,0 +1,49 @@
+"""Overlap reading documents with consuming them."""
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+from .types import T
+
+
+class Prefetcher:
+    """Apply a function ahead of the consumer on a thread pool.
+
+    Reading a file releases the GIL, so threads keep storage busy while
+    the consumer tokenizes the documents already read.
+
+    Attributes
+    ----------
+    read_ahead: int
+        The maximum number of results computed before the consumer
+        asks for them.
+
+    max_workers: int
+        The number of threads.
+
+    """
+
+    def __init__(self, read_ahead=64, max_workers=8):
+        """Take the depth of read-ahead and the number of threads."""
+        if read_ahead < 1:
+            raise ValueError('read_ahead must be positive.')
+        self.read_ahead = read_ahead
+        self.max_workers = max_workers
+
+    def map(self, function: Callable[..., T], items: Iterable) -> Iterator[T]:
+        """Yield ``function(item)`` for each of `items` in order."""
+        items = iter(items)
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            pending = deque(
+                executor.submit(function, item)
+                for item in itertools.islice(items, self.read_ahead))
+            try:
+                while pending:
+                    future = pending.popleft()
+                    for item in itertools.islice(items, 1):
+                        pending.append(executor.submit(function, item))
+                    yield future.result()
+            finally:
+                # The consumer may stop early.
+                for future in pending:
+                    future.cancel()
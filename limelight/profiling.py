@@ -0,0 +1,152 @@
+"""Provide timers and counters of the stages of the pipeline.
+
+:py:data:`PROFILER` is disabled by default, and instrumented code then
+costs one attribute lookup per call.
+
+"""
+import contextlib
+import functools
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class StageStatistics:
+    """Accumulated cost of a stage.
+
+    Attributes
+    ----------
+    seconds: float
+
+    calls: int
+
+    items: int
+
+    """
+
+    seconds: float = 0.0
+    calls: int = 0
+    items: int = 0
+
+    def get_throughput(self) -> float:
+        """Return the items per second."""
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'seconds': self.seconds,
+            'calls': self.calls,
+            'items': self.items,
+            'items_per_second': self.get_throughput()
+        }
+
+
+class Profiler:
+    """Accumulate :py:class:`StageStatistics` by stage name."""
+
+    def __init__(self):
+        """Create a disabled profiler."""
+        self.enabled = False
+        self.stages: Dict[str, StageStatistics] = {}
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Start recording."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Forget the recorded statistics."""
+        self.stages = {}
+
+    def record(self, stage: str, seconds: float, items=1) -> None:
+        """Add a call of `stage` that took `seconds` for `items`."""
+        with self.lock:
+            statistics = self.stages.get(stage)
+            if statistics is None:
+                statistics = self.stages[stage] = StageStatistics()
+            statistics.seconds += seconds
+            statistics.calls += 1
+            statistics.items += items
+
+    def timer(self, stage: str, items=1):
+        """Return a context manager that records the time of its body."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._time(stage, items)
+
+    @contextlib.contextmanager
+    def _time(self, stage: str, items: int):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, items)
+
+    def return_as_dict(self) -> dict:
+        """Return the statistics by stage."""
+        return {stage: statistics.return_as_dict()
+                for stage, statistics in sorted(self.stages.items())}
+
+    def to_json(self) -> str:
+        """Format the statistics in JSON."""
+        return json.dumps(self.return_as_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Format the statistics in the Prometheus text format."""
+        lines = []
+        for metric, attribute, help_text in [
+                ('limelight_stage_seconds_total', 'seconds',
+                 'Time spent in the stage.'),
+                ('limelight_stage_calls_total', 'calls',
+                 'Number of calls of the stage.'),
+                ('limelight_stage_items_total', 'items',
+                 'Number of items that the stage processed.')]:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} counter')
+            for stage, statistics in sorted(self.stages.items()):
+                value = getattr(statistics, attribute)
+                lines.append(f'{metric}{{stage="{stage}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+PROFILER = Profiler()
+
+
+def count_first_argument(self, items, *args, **kwargs) -> int:
+    """Count the items of the first argument of a method."""
+    return len(items)
+
+
+def profiled(stage: str, count: Optional[Callable[..., int]] = None):
+    """Record the calls of the decorated function as `stage`.
+
+    Parameters
+    ----------
+    stage: str
+
+    count: Optional[Callable[..., int]]
+        Take the arguments of the function and return the number of
+        items of the call. A call is an item without it.
+
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return function(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                items = 1 if count is None else count(*args, **kwargs)
+                PROFILER.record(stage, time.perf_counter() - started, items)
+        return wrapper
+    return decorator
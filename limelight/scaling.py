@@ -0,0 +1,152 @@
+"""Measure how the subcommands scale with the size of the corpus."""
+import json
+import math
+import os
+import os.path
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from logging import getLogger
+from typing import List
+from .synthetic import SyntheticCorpus
+
+
+@dataclass
+class StageMeasurement:
+    """The cost of a subcommand on a corpus.
+
+    Attributes
+    ----------
+    stage: str
+
+    documents: int
+
+    seconds: float
+
+    peak_rss: int
+        The maximum resident set size of the process in bytes.
+
+    """
+
+    stage: str
+    documents: int
+    seconds: float
+    peak_rss: int
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'stage': self.stage,
+            'documents': self.documents,
+            'seconds': self.seconds,
+            'peak_rss': self.peak_rss
+        }
+
+
+class ScalingHarness:
+    """Run `split`, `sparsevec`, `featuresel` and `train` at growing sizes.
+
+    Each subcommand runs in its own process so that its peak RSS is
+    measured separately.
+
+    """
+
+    LOGGER = getLogger(__name__)
+    STAGES = ['split', 'sparsevec', 'featuresel', 'train']
+
+    def __init__(self,
+                 directory: str,
+                 sizes: List[int],
+                 max_features=20000,
+                 epochs=1,
+                 seed=0):
+        """Take a directory to write corpora and artifacts."""
+        self.directory = directory
+        self.sizes = sizes
+        self.max_features = max_features
+        self.epochs = epochs
+        self.seed = seed
+
+    def run(self) -> List[StageMeasurement]:
+        """Generate a corpus of each size and run the stages on it."""
+        measurements = []
+        for size in self.sizes:
+            size_directory = os.path.join(self.directory, str(size))
+            corpus = os.path.join(size_directory, 'corpus')
+            if not os.path.exists(corpus):
+                SyntheticCorpus(size, seed=self.seed).write(corpus)
+            for stage, arguments in zip(self.STAGES,
+                                        self._create_arguments(
+                                            size_directory, corpus)):
+                measurement = self._measure(stage, size, arguments)
+                self.LOGGER.info(f'{stage} on {size} documents took '
+                                 f'{measurement.seconds:.2f}s')
+                measurements.append(measurement)
+        return measurements
+
+    def _create_arguments(self, directory: str, corpus: str):
+        def path(name):
+            return os.path.join(directory, name)
+
+        return [
+            ['split', corpus, path('train.csv'), path('test.csv'),
+             '--seed', str(self.seed)],
+            ['sparsevec', path('train.csv'), path('sparsevec')],
+            ['featuresel', path('train.csv'), path('sparsevec'),
+             path('featuresel'), '--max-features', str(self.max_features)],
+            ['train', path('featuresel'), path('train.csv'), path('model'),
+             '--epochs', str(self.epochs)]
+        ]
+
+    def _measure(self, stage: str, size: int, arguments: List[str]):
+        started = time.perf_counter()
+        command = [sys.executable, '-m', 'limelight'] + arguments
+        # A cached artifact would be measured instead of the stage.
+        environment = {name: value for name, value in os.environ.items()
+                       if name != 'LIMELIGHT_CACHE_DIR'}
+        process = subprocess.Popen(command, env=environment)
+        # wait4 reports the resource usage of this child alone.
+        _, status, usage = os.wait4(process.pid, 0)
+        seconds = time.perf_counter() - started
+        returncode = os.waitstatus_to_exitcode(status)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, command)
+        # ru_maxrss is in kilobytes on Linux.
+        return StageMeasurement(stage, size, seconds, usage.ru_maxrss * 1024)
+
+
+def tabulate(measurements: List[StageMeasurement]) -> str:
+    """Format `measurements` as a table.
+
+    The exponent column is the slope of time against size on a log-log
+    scale from the previous size, so values well above 1 are
+    superlinear.
+
+    """
+    lines = [f'{"stage":<12}{"documents":>12}{"seconds":>12}'
+             f'{"peak MiB":>12}{"exponent":>10}']
+    previous = {}
+    for measurement in measurements:
+        exponent = ''
+        if measurement.stage in previous:
+            last = previous[measurement.stage]
+            if measurement.documents != last.documents \
+                    and last.seconds > 0:
+                exponent = '%.2f' % (
+                    math.log(measurement.seconds / last.seconds)
+                    / math.log(measurement.documents / last.documents))
+        previous[measurement.stage] = measurement
+        lines.append(f'{measurement.stage:<12}'
+                     f'{measurement.documents:>12}'
+                     f'{measurement.seconds:>12.2f}'
+                     f'{measurement.peak_rss / (1 << 20):>12.1f}'
+                     f'{exponent:>10}')
+    return '\n'.join(lines)
+
+
+def save(measurements: List[StageMeasurement], filename: str):
+    """Write `measurements` in JSON."""
+    with open(filename, 'w') as f:
+        json.dump([measurement.return_as_dict()
+                   for measurement in measurements], f, indent=2)
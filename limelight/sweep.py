@@ -0,0 +1,265 @@
+"""Cross-validate hyperparameters over stratified folds in parallel."""
+import itertools
+import json
+import os
+import os.path
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from logging import getLogger
+from typing import Dict, List, Optional
+import numpy as np
+import scipy.sparse as sp
+import torch
+import torch.utils.data as tud
+import sklearn.linear_model as li
+from sklearn.model_selection import StratifiedKFold
+from .classifier import MlpClassifier, PreTrainedTextVecMlpClassifier
+from .dataset import Dataset, MatrixRowCollator
+from .news import DataPointSources
+from .pipeline import Corpus
+from .theme import Theme
+from .vectorizer import TfidfVectorizer
+
+
+@dataclass
+class SweepConfig:
+    """A combination of hyperparameters.
+
+    Attributes
+    ----------
+    max_features: int
+
+    units: int
+
+    dropout_rate: float
+
+    learning_rate: float
+
+    """
+
+    max_features: int
+    units: int
+    dropout_rate: float
+    learning_rate: float
+
+    def return_as_dict(self) -> dict:
+        """Return a dict that represents this object."""
+        return {
+            'max_features': self.max_features,
+            'units': self.units,
+            'dropout_rate': self.dropout_rate,
+            'learning_rate': self.learning_rate
+        }
+
+    @classmethod
+    def create_grid(cls,
+                    max_features: List[int],
+                    units: List[int],
+                    dropout_rates: List[float],
+                    learning_rates: List[float]) -> List['SweepConfig']:
+        """Return all the combinations."""
+        return [SweepConfig(*values) for values in itertools.product(
+            max_features, units, dropout_rates, learning_rates)]
+
+
+@dataclass
+class Fold:
+    """The manifests and the precomputed matrices of a fold.
+
+    Attributes
+    ----------
+    directory: str
+
+    """
+
+    directory: str
+
+    def get_train(self) -> str:
+        """Return the path to the train CSV file."""
+        return os.path.join(self.directory, 'train.csv')
+
+    def get_test(self) -> str:
+        """Return the path to the test CSV file."""
+        return os.path.join(self.directory, 'test.csv')
+
+    def get_matrices(self) -> str:
+        """Return the path to the precomputed matrices."""
+        return os.path.join(self.directory, 'matrices.npz')
+
+    def precompute(self) -> None:
+        """Vectorize the fold and rank the features once.
+
+        The ranking reproduces what `featuresel` selects with
+        `SelectFromModel`: features whose importance is at least the
+        mean, the most important first. Selecting `max_features` is
+        then slicing the ranking.
+
+        """
+        train = Corpus.read(DataPointSources.read_csv(self.get_train()))
+        test = Corpus.read(DataPointSources.read_csv(self.get_test()))
+        vectorizer = TfidfVectorizer()
+        vectorizer.fit(train.texts)
+        train_matrix = vectorizer.transform(train.texts).raw().tocsr()
+        test_matrix = vectorizer.transform(test.texts).raw().tocsr()
+        train_labels = train.themes.get_index()
+        estimator = li.LogisticRegression().fit(train_matrix, train_labels)
+        importance = np.linalg.norm(estimator.coef_, ord=1, axis=0)
+        ranking = np.argsort(-importance, kind='stable')
+        ranking = ranking[importance[ranking] >= importance.mean()]
+        np.savez(self.get_matrices(),
+                 ranking=ranking,
+                 train_labels=train_labels,
+                 test_labels=test.themes.get_index(),
+                 **self._to_arrays('train', train_matrix),
+                 **self._to_arrays('test', test_matrix))
+
+    def load(self) -> Dict[str, object]:
+        """Load the matrices that :py:meth:`precompute` wrote."""
+        with np.load(self.get_matrices()) as arrays:
+            return {
+                'ranking': arrays['ranking'],
+                'train_labels': arrays['train_labels'],
+                'test_labels': arrays['test_labels'],
+                'train': self._from_arrays('train', arrays),
+                'test': self._from_arrays('test', arrays)
+            }
+
+    @staticmethod
+    def _to_arrays(name: str, matrix: sp.csr_matrix) -> dict:
+        return {f'{name}_data': matrix.data,
+                f'{name}_indices': matrix.indices,
+                f'{name}_indptr': matrix.indptr,
+                f'{name}_shape': np.asarray(matrix.shape)}
+
+    @staticmethod
+    def _from_arrays(name: str, arrays) -> sp.csr_matrix:
+        return sp.csr_matrix((arrays[f'{name}_data'],
+                              arrays[f'{name}_indices'],
+                              arrays[f'{name}_indptr']),
+                             shape=tuple(arrays[f'{name}_shape']))
+
+
+class Sweep:
+    """Evaluate every :py:class:`SweepConfig` on every fold.
+
+    (fold, config) jobs run on a process pool fold by fold, and the jobs
+    of a fold that run on the same worker share the matrices that
+    :py:meth:`Fold.precompute` wrote.
+
+    """
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self,
+                 directory: str,
+                 configs: List[SweepConfig],
+                 num_folds=5,
+                 epochs=10,
+                 batch_size=32,
+                 max_workers: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """Take the directory to write folds and the report."""
+        self.directory = directory
+        self.configs = configs
+        self.num_folds = num_folds
+        self.epochs = epochs
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.seed = seed
+
+    def run(self, dataset: Dataset) -> dict:
+        """Cross-validate on `dataset`, returning the report."""
+        folds = self.split(dataset)
+        with ProcessPoolExecutor(self.max_workers,
+                                 initializer=_initialize_worker) as executor:
+            list(executor.map(Fold.precompute, folds))
+            self.LOGGER.info(f'precomputed {len(folds)} folds')
+            jobs = [(fold, config) for fold in folds
+                    for config in self.configs]
+            results = list(executor.map(
+                _evaluate,
+                [fold for fold, _ in jobs],
+                [config for _, config in jobs],
+                itertools.repeat(self.epochs),
+                itertools.repeat(self.batch_size)))
+        report = self.summarize(results)
+        with open(os.path.join(self.directory, 'report.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+        return report
+
+    def split(self, dataset: Dataset) -> List[Fold]:
+        """Write the manifests of stratified folds."""
+        sources = dataset.sources
+        labels = [source.get_theme().value for source in sources]
+        splitter = StratifiedKFold(self.num_folds,
+                                   shuffle=True,
+                                   random_state=self.seed)
+        folds = []
+        for index, (train, test) in enumerate(
+                splitter.split(np.zeros(len(labels)), labels)):
+            fold = Fold(os.path.join(self.directory, f'fold{index}'))
+            os.makedirs(fold.directory, exist_ok=True)
+            DataPointSources([sources[i] for i in train]) \
+                .save_csv(fold.get_train())
+            DataPointSources([sources[i] for i in test]) \
+                .save_csv(fold.get_test())
+            folds.append(fold)
+        return folds
+
+    def summarize(self, results: List[dict]) -> dict:
+        """Aggregate the accuracy of each config over the folds."""
+        summary = []
+        for config in self.configs:
+            accuracies = [result['accuracy'] for result in results
+                          if result['config'] == config.return_as_dict()]
+            summary.append({'config': config.return_as_dict(),
+                            'mean_accuracy': float(np.mean(accuracies)),
+                            'std_accuracy': float(np.std(accuracies))})
+        summary.sort(key=lambda item: -item['mean_accuracy'])
+        return {'summary': summary, 'jobs': results}
+
+
+# The matrices of the fold that this worker evaluated last. Jobs are
+# handed out fold by fold, so a worker holds one fold at a time.
+_MATRICES: Dict[str, dict] = {}
+
+
+def _initialize_worker():
+    # Jobs run in parallel processes, so intra-op threads oversubscribe.
+    torch.set_num_threads(1)
+
+
+def _evaluate(fold: Fold,
+              config: SweepConfig,
+              epochs: int,
+              batch_size: int) -> dict:
+    if fold.directory not in _MATRICES:
+        _MATRICES.clear()
+        _MATRICES[fold.directory] = fold.load()
+    matrices = _MATRICES[fold.directory]
+    columns = matrices['ranking'][:config.max_features]
+    train = matrices['train'][:, columns]
+    classifier = MlpClassifier(len(columns),
+                               Theme.num_of_themes(),
+                               config.units,
+                               config.dropout_rate)
+    dataloader = tud.DataLoader(
+        range(train.shape[0]),
+        batch_size=batch_size,
+        shuffle=True,
+        collate_fn=MatrixRowCollator(train, matrices['train_labels']))
+    PreTrainedTextVecMlpClassifier(None, classifier).train(
+        dataloader, epochs, config.learning_rate, vectorized=True)
+    test = matrices['test'][:, columns]
+    test_collator = MatrixRowCollator(test, matrices['test_labels'])
+    correct = 0
+    classifier.eval()
+    with torch.no_grad():
+        for start in range(0, test.shape[0], batch_size):
+            features, labels = test_collator(
+                np.arange(start, min(start + batch_size, test.shape[0])))
+            correct += int(
+                (classifier(features).argmax(dim=1) == labels).sum())
+    return {'fold': fold.directory,
+            'config': config.return_as_dict(),
+            'accuracy': correct / max(test.shape[0], 1)}
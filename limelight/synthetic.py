@@ -0,0 +1,102 @@
+"""Generate synthetic corpora in the layout of 20 Newsgroups."""
+import os
+import os.path
+from logging import getLogger
+from typing import Optional
+import numpy as np
+from .theme import Theme
+
+
+class SyntheticCorpus:
+    """Write documents that :py:meth:`limelight.dataset.Dataset.create` reads.
+
+    Document lengths in words follow a log-normal distribution, and
+    themes follow a Zipf-like distribution whose exponent is
+    :py:attr:`skew`. Words are drawn from a Zipfian shared vocabulary
+    mixed with words specific to the theme.
+
+    """
+
+    LOGGER = getLogger(__name__)
+
+    def __init__(self,
+                 num_of_documents: int,
+                 mean_length=250,
+                 sigma=1.0,
+                 skew=0.0,
+                 vocabulary_size=50000,
+                 theme_word_rate=0.1,
+                 seed: Optional[int] = 0):
+        """Take the shape of the corpus.
+
+        Parameters
+        ----------
+        num_of_documents: int
+
+        mean_length: float
+            The mean number of words of a document.
+
+        sigma: float
+            The standard deviation of the logarithm of lengths.
+
+        skew: float
+            0 spreads documents evenly over the themes. The larger,
+            the more documents the first themes get.
+
+        vocabulary_size: int
+
+        theme_word_rate: float
+            The fraction of words specific to the theme of a document.
+
+        seed: Optional[int]
+
+        """
+        self.num_of_documents = num_of_documents
+        self.mean_length = mean_length
+        self.sigma = sigma
+        self.skew = skew
+        self.vocabulary_size = vocabulary_size
+        self.theme_word_rate = theme_word_rate
+        self.seed = seed
+
+    def get_theme_probabilities(self) -> np.ndarray:
+        """Return the probability of each theme ordered by value."""
+        weights = 1 / np.arange(1, Theme.num_of_themes() + 1) ** self.skew
+        return weights / weights.sum()
+
+    def write(self, directory: str) -> None:
+        """Write the documents under `directory`."""
+        random = np.random.default_rng(self.seed)
+        themes = random.choice(Theme.num_of_themes(),
+                               size=self.num_of_documents,
+                               p=self.get_theme_probabilities())
+        # The mean of a log-normal distribution is exp(mu + sigma^2 / 2).
+        mu = np.log(self.mean_length) - self.sigma ** 2 / 2
+        lengths = np.maximum(
+            random.lognormal(mu, self.sigma, self.num_of_documents), 1) \
+            .astype(np.int64)
+        for theme in Theme:
+            os.makedirs(os.path.join(directory, theme.get_theme_name()),
+                        exist_ok=True)
+        for point_id, (theme_value, length) in enumerate(
+                zip(themes.tolist(), lengths.tolist())):
+            theme = Theme(theme_value)
+            path = os.path.join(
+                directory, theme.get_theme_name(), str(point_id))
+            with open(path, 'w') as f:
+                f.write(self._create_document(random, theme, length))
+            if point_id % 10000 == 9999:
+                self.LOGGER.info(f'wrote {point_id + 1} documents')
+
+    def _create_document(self, random, theme: Theme, length: int) -> str:
+        shared = random.zipf(1.2, length) % self.vocabulary_size
+        specific = random.zipf(1.5, length) % 1000
+        is_specific = random.random(length) < self.theme_word_rate
+        words = [f't{theme.value}w{word}' if specific_word else f'w{word}'
+                 for word, specific_word in zip(
+                     np.where(is_specific, specific, shared).tolist(),
+                     is_specific.tolist())]
+        body = ' '.join(words)
+        return f'From: user@example.com\n' \
+            f'Newsgroups: {theme.get_theme_name()}\n' \
+            f'Subject: {" ".join(words[:5])}\n\n{body}\n'
@@ -1,8 +1,9 @@
 """Expose classes relevant to labels."""
 import enum
-from typing import List
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple, Union
 import numpy as np
+import scipy.sparse as sp
+import torch
 
 
 class Theme(enum.Enum):
@@ -38,9 +39,7 @@ class Theme(enum.Enum):
             directory name.
 
         """
-        if self == self.COMP_OS_MS_WINDOWS_MISC:
-            return 'comp.os.ms-windows.misc'
-        return self.name.replace('_', '.').lower()
+        return _NAMES[self]
 
     @classmethod
     def get_themename_list(cls) -> List[str]:
@@ -54,9 +53,9 @@ class Theme(enum.Enum):
     @classmethod
     def create(cls, theme: str):
         """Create :py:class:`Theme` from a `str`."""
-        found = [item for item in Theme if item.is_same(theme)]
-        if len(found) == 1:
-            return found[0]
+        found = _THEMES_BY_NAME.get(theme)
+        if found is not None:
+            return found
         raise ValueError(f'{theme} is not a theme name')
 
     @classmethod
@@ -65,35 +64,88 @@ class Theme(enum.Enum):
         return len(cls)
 
 
-@dataclass
+def _create_name(theme: Theme) -> str:
+    if theme == Theme.COMP_OS_MS_WINDOWS_MISC:
+        return 'comp.os.ms-windows.misc'
+    return theme.name.replace('_', '.').lower()
+
+
+# Looked up per document, so they are computed once.
+_NAMES: Dict[Theme, str] = {theme: _create_name(theme) for theme in Theme}
+_THEMES_BY_NAME: Dict[str, Theme] = {
+    name: theme for theme, name in _NAMES.items()}
+_THEMES_BY_VALUE: Tuple[Theme, ...] = tuple(
+    sorted(Theme, key=lambda theme: theme.value))
+
+
 class Themes:
-    """A collection of :py:class:`Themes`."""
+    """A collection of :py:class:`Theme`s backed by an array of values.
 
-    themes: List[Theme]
+    Attributes
+    ----------
+    values: numpy.ndarray
+        The int64 value of each theme.
+
+    """
+
+    def __init__(self, themes: Union[Iterable[Theme], np.ndarray]):
+        """Take themes or an array of their values."""
+        if isinstance(themes, np.ndarray):
+            self.values = themes.astype(np.int64, copy=False)
+        else:
+            self.values = np.fromiter((theme.value for theme in themes),
+                                      dtype=np.int64)
 
     def get_index_matrix(self) -> np.ndarray:
         """Return array-like of shape (n_samples, n_outputs)."""
-        index = self.get_index()
-        return np.identity(Theme.num_of_themes())[index].astype(np.int32)
-
-    def get_index(self) -> List[int]:
+        matrix = np.zeros((len(self.values), Theme.num_of_themes()),
+                          dtype=np.int32)
+        matrix[np.arange(len(self.values)), self.values] = 1
+        return matrix
+
+    def get_sparse_index_matrix(self) -> sp.csr_matrix:
+        """Return the one-hot matrix of :py:meth:`get_index_matrix`."""
+        return sp.csr_matrix(
+            (np.ones(len(self.values), dtype=np.int32),
+             self.values,
+             np.arange(len(self.values) + 1)),
+            shape=(len(self.values), Theme.num_of_themes()))
+
+    def get_index(self) -> np.ndarray:
         """Return the index.
 
         Returns
         -------
-        list
+        numpy.ndarray
             Each item is an `int`-typed ID.
 
         """
-        return [theme.value for theme in self.themes]
+        return self.values
+
+    def as_torch_tensor(self) -> torch.Tensor:
+        """Return the values as a tensor that shares the memory."""
+        return torch.from_numpy(self.values)
 
     def __len__(self) -> int:
         """Return the size."""
-        return len(self.themes)
+        return len(self.values)
 
     def __getitem__(self, index):
         """Access items with a key."""
-        found = self.themes.__getitem__(index)
-        if isinstance(found, Theme):
-            return found
-        return Themes(found)
+        found = self.values[index]
+        if isinstance(found, np.ndarray):
+            return Themes(found)
+        return _THEMES_BY_VALUE[found]
+
+    def __iter__(self):
+        """Iterate over the themes."""
+        return (_THEMES_BY_VALUE[value] for value in self.values.tolist())
+
+    def __eq__(self, other) -> bool:
+        """Return `True` if `other` has the same themes in order."""
+        return isinstance(other, Themes) \
+            and np.array_equal(self.values, other.values)
+
+    def __repr__(self) -> str:
+        """Return the themes."""
+        return f'Themes({list(self)})'
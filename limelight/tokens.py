@@ -0,0 +1,348 @@
+"""Expose a corpus tokenized once into integer arrays."""
+import array
+import os
+import os.path
+import re
+from typing import Iterable, List, Optional
+import numpy as np
+import scipy.sparse as sp
+from greentea.text import Text
+from .profiling import profiled, count_first_argument
+from .theme import Themes
+from .vector import SparseTextVectors, TokenIdVectors
+from .vectorizer import Vectorizer
+
+
+class Tokenizer:
+    """Split a text the same way as `sklearn.feature_extraction.text`."""
+
+    PATTERN = re.compile(r'(?u)\b\w\w+\b')
+
+    def __call__(self, text: Text) -> List[str]:
+        """Return the lowercased tokens of `text`."""
+        return self.PATTERN.findall(text.text.lower())
+
+    def encode(self, texts: Iterable[Text], token_ids: dict):
+        """Return token ids and per-document offsets of `texts`.
+
+        Tokens missing from `token_ids` become -1.
+
+        """
+        tokens = array.array('i')
+        offsets = array.array('q', [0])
+        for text in texts:
+            tokens.extend(token_ids.get(token, -1) for token in self(text))
+            offsets.append(len(tokens))
+        return np.frombuffer(tokens, dtype=np.int32), \
+            np.frombuffer(offsets, dtype=np.int64)
+
+
+class TokenizedCorpus:
+    """Documents as a flat array of token ids with per-document offsets.
+
+    The tokens of the i-th document are
+    ``tokens[offsets[i]:offsets[i + 1]]``, and ``vocabulary[j]`` is the
+    token whose id is `j`.
+
+    Attributes
+    ----------
+    vocabulary: List[str]
+
+    tokens: numpy.ndarray
+        int32 token ids.
+
+    offsets: numpy.ndarray
+        int64 array of length ``len(self) + 1``.
+
+    labels: Optional[numpy.ndarray]
+        The values of the themes of the documents.
+
+    """
+
+    TOKENS = 'tokens.npy'
+    OFFSETS = 'offsets.npy'
+    LABELS = 'labels.npy'
+    VOCABULARY = 'vocabulary.txt'
+
+    def __init__(self,
+                 vocabulary: List[str],
+                 tokens: np.ndarray,
+                 offsets: np.ndarray,
+                 labels: Optional[np.ndarray] = None):
+        """Take the arrays that :py:meth:`build` creates."""
+        self.vocabulary = vocabulary
+        self.tokens = tokens
+        self.offsets = offsets
+        self.labels = labels
+
+    def __len__(self) -> int:
+        """Return the number of documents."""
+        return len(self.offsets) - 1
+
+    def get_themes(self) -> Themes:
+        """Return the themes of the documents."""
+        if self.labels is None:
+            raise ValueError('The corpus was built without themes.')
+        return Themes(np.array(self.labels))
+
+    def get_lengths(self) -> np.ndarray:
+        """Return the number of tokens of each document."""
+        return np.diff(self.offsets)
+
+    @classmethod
+    def build(cls,
+              texts: Iterable[Text],
+              themes: Optional[Themes] = None,
+              tokenizer=Tokenizer()):
+        """Tokenize `texts`, assigning ids in order of appearance."""
+        token_ids = {}
+        tokens = array.array('i')
+        offsets = array.array('q', [0])
+        for text in texts:
+            tokens.extend(token_ids.setdefault(token, len(token_ids))
+                          for token in tokenizer(text))
+            offsets.append(len(tokens))
+        labels = None if themes is None \
+            else themes.get_index().copy()
+        return TokenizedCorpus(list(token_ids),
+                               np.frombuffer(tokens, dtype=np.int32),
+                               np.frombuffer(offsets, dtype=np.int64),
+                               labels)
+
+    def save(self, directory: str):
+        """Write the arrays into `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, self.TOKENS), self.tokens)
+        np.save(os.path.join(directory, self.OFFSETS), self.offsets)
+        if self.labels is not None:
+            np.save(os.path.join(directory, self.LABELS), self.labels)
+        with open(os.path.join(directory, self.VOCABULARY), 'w') as f:
+            f.writelines(f'{token}\n' for token in self.vocabulary)
+
+    @classmethod
+    def load(cls, directory: str):
+        """Memory-map a corpus that :py:meth:`save` wrote."""
+        with open(os.path.join(directory, cls.VOCABULARY)) as f:
+            vocabulary = f.read().splitlines()
+        labels_file = os.path.join(directory, cls.LABELS)
+        return TokenizedCorpus(
+            vocabulary,
+            np.load(os.path.join(directory, cls.TOKENS), mmap_mode='r'),
+            np.load(os.path.join(directory, cls.OFFSETS), mmap_mode='r'),
+            np.load(labels_file) if os.path.exists(labels_file) else None)
+
+    def remap(self, token_ids: dict) -> np.ndarray:
+        """Translate :py:attr:`tokens` into the ids of `token_ids`.
+
+        Tokens missing from `token_ids` become -1.
+
+        """
+        mapping = np.fromiter(
+            (token_ids.get(token, -1) for token in self.vocabulary),
+            dtype=np.int32,
+            count=len(self.vocabulary))
+        return mapping[self.tokens]
+
+
+class CorpusTfidfVectorizer(Vectorizer):
+    """A TF-IDF vectorizer that counts n-grams of token ids.
+
+    It computes the same weights as `sklearn`'s `TfidfVectorizer` with
+    the same `min_df`, `max_df` and `ngram_range`, but builds matrices
+    from a :py:class:`TokenizedCorpus` with numpy operations, so
+    changing these parameters does not tokenize the texts again.
+
+    """
+
+    def __init__(self, min_df=1, max_df=1.0, ngram_range=(1, 1)):
+        """Take the parameters `sklearn`'s `TfidfVectorizer` takes."""
+        self.min_df = min_df
+        self.max_df = max_df
+        self.ngram_range = ngram_range
+        self.token_ids = None
+        self.features = None
+        self.idf = None
+
+    def fit(self, texts, themes=None, **kwargs):
+        """Fit on `texts`.
+
+        Parameters
+        ----------
+        texts: Union[Texts, TokenizedCorpus]
+
+        Returns
+        -------
+        self
+
+        """
+        corpus = self._to_corpus(texts)
+        self.token_ids = {token: token_id
+                          for token_id, token in enumerate(corpus.vocabulary)}
+        keys, documents = self._ngrams(
+            np.asarray(corpus.tokens), np.asarray(corpus.offsets))
+        features, columns = np.unique(keys, return_inverse=True)
+        pairs = np.unique(documents * len(features) + columns)
+        document_frequency = np.bincount(
+            pairs % len(features), minlength=len(features))
+        num_of_documents = len(corpus)
+        kept = (document_frequency >= self._to_count(
+            self.min_df, num_of_documents)) & \
+            (document_frequency <= self._to_count(
+                self.max_df, num_of_documents))
+        self.features = features[kept]
+        self.idf = (np.log((1 + num_of_documents)
+                           / (1 + document_frequency[kept])) + 1) \
+            .astype(np.float32)
+        return self
+
+    @profiled('CorpusTfidfVectorizer.transform', count_first_argument)
+    def transform(self, texts) -> SparseTextVectors:
+        """Transform texts or a :py:class:`TokenizedCorpus` to vectors."""
+        if isinstance(texts, TokenizedCorpus):
+            tokens = texts.remap(self.token_ids)
+            offsets = np.asarray(texts.offsets)
+        else:
+            tokens, offsets = Tokenizer().encode(texts, self.token_ids)
+        keys, documents = self._ngrams(tokens, offsets)
+        columns = np.searchsorted(self.features, keys)
+        columns[columns == len(self.features)] = 0
+        found = self.features[columns] == keys \
+            if len(self.features) else np.zeros(len(keys), dtype=bool)
+        counts = sp.csr_matrix(
+            (np.ones(found.sum(), dtype=np.float32),
+             (documents[found], columns[found])),
+            shape=(len(offsets) - 1, len(self.features)))
+        counts.sum_duplicates()
+        vectors = counts.multiply(self.idf).tocsr()
+        norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)))
+        norms[norms == 0] = 1
+        return SparseTextVectors(
+            vectors.multiply(1 / norms).tocsr().astype(np.float32))
+
+    def get_num_of_features(self):
+        """Return the number of features."""
+        return len(self.features)
+
+    def _to_corpus(self, texts) -> TokenizedCorpus:
+        if isinstance(texts, TokenizedCorpus):
+            return texts
+        return TokenizedCorpus.build(texts)
+
+    def _ngrams(self, tokens: np.ndarray, offsets: np.ndarray):
+        """Return the int64 key and the document of each n-gram.
+
+        An n-gram of ids ``t_1 ... t_n`` is
+        ``base_n + sum(t_j * V ** (n - j))`` where `V` is the size of the
+        vocabulary and ``base_n`` is the number of shorter n-grams.
+
+        """
+        size = len(self.token_ids)
+        low, high = self.ngram_range
+        if (size + 1) ** high >= np.iinfo(np.int64).max:
+            raise ValueError(
+                f'{high}-grams of {size} tokens do not fit in int64 keys')
+        documents = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64),
+                              np.diff(offsets))
+        all_keys, all_documents = [], []
+        base = sum(size ** n for n in range(1, low))
+        for n in range(low, high + 1):
+            last = len(tokens) - n + 1
+            if last <= 0:
+                break
+            keys = np.zeros(last, dtype=np.int64)
+            valid = documents[:last] == documents[n - 1:]
+            for j in range(n):
+                window = tokens[j:j + last]
+                valid &= window >= 0
+                keys = keys * size + window
+            all_keys.append(keys[valid] + base)
+            all_documents.append(documents[:last][valid])
+            base += size ** n
+        if not all_keys:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(all_keys), np.concatenate(all_documents)
+
+    @staticmethod
+    def _to_count(frequency, num_of_documents: int):
+        if isinstance(frequency, float):
+            return frequency * num_of_documents
+        return frequency
+
+
+class TokenIdEncoder(Vectorizer):
+    """Encode texts to token ids and hashed bigram ids.
+
+    The vectors that it emits are the input of
+    :py:class:`limelight.classifier.EmbeddingBagClassifier`.
+    Ids of bigrams start from the size of the vocabulary and are hashed
+    into :py:attr:`num_buckets` buckets.
+
+    """
+
+    PRIME = 1000003
+
+    def __init__(self, num_buckets=0, min_count=1):
+        """Take the number of buckets of bigrams.
+
+        Parameters
+        ----------
+        num_buckets: int
+            No bigrams are used if it is 0.
+
+        min_count: int
+            Tokens that occur less than this are ignored.
+
+        """
+        self.num_buckets = num_buckets
+        self.min_count = min_count
+        self.token_ids = None
+
+    def fit(self, texts, themes=None, **kwargs):
+        """Build the vocabulary from texts or a :py:class:`TokenizedCorpus`.
+
+        Returns
+        -------
+        self
+
+        """
+        corpus = texts if isinstance(texts, TokenizedCorpus) \
+            else TokenizedCorpus.build(texts)
+        counts = np.bincount(np.asarray(corpus.tokens),
+                             minlength=len(corpus.vocabulary))
+        kept = np.flatnonzero(counts >= self.min_count).tolist()
+        self.token_ids = {corpus.vocabulary[token_id]: new_id
+                          for new_id, token_id in enumerate(kept)}
+        return self
+
+    @profiled('TokenIdEncoder.transform', count_first_argument)
+    def transform(self, texts) -> TokenIdVectors:
+        """Transform texts or a :py:class:`TokenizedCorpus` to ids."""
+        if isinstance(texts, TokenizedCorpus):
+            tokens = texts.remap(self.token_ids)
+            offsets = np.asarray(texts.offsets)
+        else:
+            tokens, offsets = Tokenizer().encode(texts, self.token_ids)
+        tokens = tokens.astype(np.int64)
+        documents = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        ids = [tokens]
+        id_documents = [documents]
+        if self.num_buckets > 0 and len(tokens) > 1:
+            first, second = tokens[:-1], tokens[1:]
+            valid = (documents[:-1] == documents[1:]) \
+                & (first >= 0) & (second >= 0)
+            ids.append(len(self.token_ids)
+                       + (first[valid] * self.PRIME + second[valid])
+                       % self.num_buckets)
+            id_documents.append(documents[:-1][valid])
+        ids = np.concatenate(ids)
+        id_documents = np.concatenate(id_documents)
+        known = ids >= 0
+        ids, id_documents = ids[known], id_documents[known]
+        order = np.argsort(id_documents, kind='stable')
+        starts = np.searchsorted(id_documents[order],
+                                 np.arange(len(offsets) - 1))
+        return TokenIdVectors(ids[order], starts.astype(np.int64))
+
+    def get_num_of_features(self):
+        """Return the number of ids including the buckets of bigrams."""
+        return len(self.token_ids) + self.num_buckets
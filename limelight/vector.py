@@ -58,3 +58,34 @@ class SparseTextVectors(TextVectors):
     def raw(self):
         """Return the holding sparse matrix."""
         return self.vectors
+
+    def as_torch_tensor(self):
+        """Convert :py:attr:`vectors` to a dense `torch.Tensor`."""
+        return torch.from_numpy(self.vectors.toarray())
+
+
+class TokenIdVectors(TextVectors):
+    """Token ids of documents concatenated into one sequence.
+
+    Attributes
+    ----------
+    token_ids: numpy.ndarray
+
+    offsets: numpy.ndarray
+        The start position of each document in :py:attr:`token_ids`.
+
+    """
+
+    def __init__(self, token_ids, offsets):
+        """Take int64 arrays of ids and offsets."""
+        self.token_ids = token_ids
+        self.offsets = offsets
+
+    def raw(self):
+        """Return the pair of :py:attr:`token_ids` and :py:attr:`offsets`."""
+        return self.token_ids, self.offsets
+
+    def as_torch_tensor(self):
+        """Return the pair that `torch.nn.EmbeddingBag` takes."""
+        return torch.from_numpy(self.token_ids), \
+            torch.from_numpy(self.offsets)
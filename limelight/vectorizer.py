@@ -1,11 +1,16 @@
 """Gathers utilities to build feature vectors from text documents."""
 import abc
+from typing import Iterable
 import joblib
-from greentea.text import Texts
+import numpy as np
+import scipy.sparse as sp
+from greentea.text import Text, Texts
 import sklearn.feature_extraction.text as t
 import sklearn.linear_model as li
 import sklearn.feature_selection as s
 import sklearn.ensemble as e
+import sklearn.preprocessing as pr
+from .profiling import profiled, count_first_argument
 from .vector import TextVectors, SparseTextVectors, DenseTextVectors
 from .theme import Themes
 
@@ -31,6 +36,24 @@ class Vectorizer(metaclass=abc.ABCMeta):
     def transform(self, texts: Texts) -> TextVectors:
         """Transform texts to feature vectors."""
 
+    def fit_transform(self, texts: Texts, themes=None, **kwargs) \
+            -> TextVectors:
+        """Fit on `texts` and return their feature vectors."""
+        self.fit(texts, themes, **kwargs)
+        return self.transform(texts)
+
+    def partial_fit(self, texts: Texts):
+        """Update the statistics with new `texts`, keeping the features.
+
+        Raises
+        ------
+        NotImplementedError
+            If the vectorizer cannot learn incrementally.
+
+        """
+        raise NotImplementedError(
+            f'{type(self).__name__} cannot learn incrementally.')
+
     def dump(self, filename: str):
         """Write this object to a file."""
         joblib.dump(self, filename)
@@ -48,21 +71,36 @@ class Vectorizer(metaclass=abc.ABCMeta):
 class TfidfVectorizer(Vectorizer):
     """TfidfVectorizer."""
 
-    def __init__(self):
-        """Create a TfidfVectorizer object."""
-        self.vectorizer = t.TfidfVectorizer()
+    def __init__(self, **kwargs):
+        """Create a TfidfVectorizer object.
 
-    def fit(self, texts: Texts, themes=None, **kwargs):
+        Parameters
+        ----------
+        kwargs
+            Passed to `sklearn.feature_extraction.text.TfidfVectorizer`.
+
+        """
+        self.vectorizer = t.TfidfVectorizer(**kwargs)
+
+    def fit(self, texts: Iterable[Text], themes=None, **kwargs):
         """Overwrite the parent method.
 
         Parameters
         ----------
-        texts: Texts
+        texts: Iterable[Text]
+            It is passed over once, so it can be read lazily.
 
         """
-        raw_texts = texts.raw_texts()
-        return self.vectorizer.fit(raw_texts)
+        return self.vectorizer.fit(text.text for text in texts)
 
+    @profiled('TfidfVectorizer.fit_transform', count_first_argument)
+    def fit_transform(self, texts: Texts, themes=None, **kwargs) \
+            -> SparseTextVectors:
+        """Fit on `texts` tokenizing them once, and return their vectors."""
+        vectors = self.vectorizer.fit_transform(texts.raw_texts())
+        return SparseTextVectors(vectors.astype('float32'))
+
+    @profiled('TfidfVectorizer.transform', count_first_argument)
     def transform(self, texts: Texts) -> SparseTextVectors:
         """Transform texts to feature vectors."""
         vectors = self.vectorizer.transform(texts.raw_texts())
@@ -70,7 +108,68 @@ class TfidfVectorizer(Vectorizer):
 
     def get_num_of_features(self):
         """Return the number of features."""
-        raise NotImplementedError
+        return len(self.vectorizer.vocabulary_)
+
+
+class HashedTfidfVectorizer(Vectorizer):
+    """TF-IDF over a fixed hashed feature space.
+
+    Features do not depend on the texts fitted, and document frequencies
+    are running counts, so :py:meth:`partial_fit` refreshes the IDF with
+    new texts only. The weights are those of
+    `sklearn.feature_extraction.text.TfidfVectorizer` with the default
+    smoothing and normalization, up to hash collisions.
+
+    Attributes
+    ----------
+    document_frequency: numpy.ndarray
+        The number of documents that have each feature.
+
+    num_of_documents: int
+
+    """
+
+    def __init__(self, num_features=1 << 18, ngram_range=(1, 1)):
+        """Take the size of the hashed space and the lengths of n-grams."""
+        self.vectorizer = t.HashingVectorizer(n_features=num_features,
+                                              ngram_range=ngram_range,
+                                              alternate_sign=False,
+                                              norm=None)
+        self.document_frequency = np.zeros(num_features, dtype=np.int64)
+        self.num_of_documents = 0
+
+    def fit(self, texts: Iterable[Text], themes=None, **kwargs):
+        """Count document frequencies of `texts` from scratch."""
+        self.document_frequency[:] = 0
+        self.num_of_documents = 0
+        return self.partial_fit(texts)
+
+    def partial_fit(self, texts: Iterable[Text]):
+        """Add the document frequencies of `texts`, passing over them once."""
+        counts = self.vectorizer.transform(text.text for text in texts) \
+            .tocsr()
+        self.document_frequency += np.bincount(
+            counts.indices, minlength=self.get_num_of_features())
+        self.num_of_documents += counts.shape[0]
+        return self
+
+    def get_idf(self) -> np.ndarray:
+        """Return the smoothed inverse document frequencies."""
+        return (np.log((1 + self.num_of_documents)
+                       / (1 + self.document_frequency)) + 1) \
+            .astype(np.float32)
+
+    @profiled('HashedTfidfVectorizer.transform', count_first_argument)
+    def transform(self, texts: Texts) -> SparseTextVectors:
+        """Transform texts to feature vectors."""
+        counts = self.vectorizer.transform(texts.raw_texts()) \
+            .astype(np.float32)
+        vectors = pr.normalize(counts @ sp.diags(self.get_idf()))
+        return SparseTextVectors(vectors.tocsr())
+
+    def get_num_of_features(self):
+        """Return the number of features."""
+        return self.vectorizer.n_features
 
 
 class FeatureSelectedVectorizer(Vectorizer, metaclass=abc.ABCMeta):
@@ -99,16 +198,35 @@ class FeatureSelectedVectorizer(Vectorizer, metaclass=abc.ABCMeta):
 
         """
         feature_vectors = self.vectorizer.transform(texts)
+        return self.fit_vectors(feature_vectors, themes)
+
+    def fit_vectors(self, feature_vectors: TextVectors, themes: Themes):
+        """Fit on vectors that the base vectorizer has transformed."""
         raw_feature_vectors = feature_vectors.raw()
         matrix = self.get_targets(themes)
         return self.select_from_model.fit(raw_feature_vectors, matrix)
 
+    @profiled('FeatureSelectedVectorizer.transform', count_first_argument)
     def transform(self, texts: Texts) -> DenseTextVectors:
         """Transform texts to feature vectors."""
-        sparse_vectors = self.vectorizer.transform(texts)
-        raw_vectors = sparse_vectors.raw()
-        dense_vectors = self.select_from_model.transform(raw_vectors)
-        return DenseTextVectors(dense_vectors)
+        return self.transform_vectors(self.vectorizer.transform(texts))
+
+    def partial_fit(self, texts: Texts):
+        """Update the base vectorizer, keeping the selected features."""
+        self.vectorizer.partial_fit(texts)
+        return self
+
+    def transform_vectors(
+            self, feature_vectors: TextVectors) -> DenseTextVectors:
+        """Select features from vectors of the base vectorizer."""
+        selected_vectors = self.select_vectors(feature_vectors)
+        if sp.issparse(selected_vectors):
+            selected_vectors = selected_vectors.toarray()
+        return DenseTextVectors(selected_vectors)
+
+    def select_vectors(self, feature_vectors: TextVectors):
+        """Return the selected columns of the raw matrix, keeping sparsity."""
+        return self.select_from_model.transform(feature_vectors.raw())
 
     @abc.abstractmethod
     def get_targets(self, themes: Themes):
@@ -123,7 +241,7 @@ class FeatureSelectedVectorizer(Vectorizer, metaclass=abc.ABCMeta):
 
     def get_num_of_features(self):
         """Return the number of features."""
-        raise NotImplementedError
+        return int(self.select_from_model.get_support().sum())
 
 
 class RandomForestFSVectorizer(FeatureSelectedVectorizer):
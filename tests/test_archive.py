@@ -0,0 +1,73 @@
+from unittest import TestCase
+import io
+import os.path
+import tarfile
+import tempfile
+import limelight.archive as a
+import limelight.dataset as d
+import limelight.theme as t
+
+
+class TestDocumentPack(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = os.path.join(self.directory.name, '20news.tar.gz')
+        self.documents = {
+            '20_newsgroups/sci.space/101': b'orbit',
+            '20_newsgroups/rec.autos/102': b'engine \xff',
+            '20_newsgroups/rec.autos/README': b'ignored'
+        }
+        with tarfile.open(self.archive, 'w:gz') as tar:
+            for name, document in self.documents.items():
+                member = tarfile.TarInfo(name)
+                member.size = len(document)
+                tar.addfile(member, io.BytesIO(document))
+        self.location = os.path.join(self.directory.name, 'pack')
+        self.pack = a.DocumentPack.build(self.archive, self.location)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_read(self):
+        self.assertEqual(len(self.pack), 2)
+        self.assertEqual(self.pack.read(t.Theme.SCI_SPACE, 101), b'orbit')
+        self.assertEqual(self.pack.read(t.Theme.REC_AUTOS, 102),
+                         b'engine \xff')
+        with self.assertRaises(KeyError):
+            self.pack.read(t.Theme.SCI_SPACE, 102)
+
+    def test_open(self):
+        self.assertIsNone(a.DocumentPack.open(self.directory.name))
+        self.assertIsNone(a.DocumentPack.open(self.archive))
+        self.assertIs(a.DocumentPack.open(self.location),
+                      a.DocumentPack.open(self.location))
+
+    def test_rebuild(self):
+        old = a.DocumentPack.open(self.location)
+        old.read(t.Theme.SCI_SPACE, 101)
+
+        a.DocumentPack.write(self.location,
+                             [(t.Theme.SCI_SPACE, 101, b'a new orbit')])
+        new = a.DocumentPack.open(self.location)
+
+        self.assertIsNot(new, old)
+        self.assertEqual(new.read(t.Theme.SCI_SPACE, 101), b'a new orbit')
+        self.assertEqual(old.read(t.Theme.SCI_SPACE, 101), b'orbit')
+        os.remove(new.get_index())
+        self.assertIs(a.DocumentPack.open(self.location), new)
+        a.DocumentPack.forget(self.location)
+        self.assertIsNone(a.DocumentPack.open(self.location))
+
+    def test_close(self):
+        with a.DocumentPack(self.location) as pack:
+            pack.read(t.Theme.SCI_SPACE, 101)
+            descriptor = pack._descriptor
+        self.assertIsNone(pack._descriptor)
+        with self.assertRaises(OSError):
+            os.fstat(descriptor)
+
+    def test_dataset(self):
+        dataset = d.Dataset.create(self.location)
+        texts = sorted(source.read_text().text for source in dataset)
+        self.assertEqual(texts, ['engine ', 'orbit'])
@@ -0,0 +1,47 @@
+from unittest import TestCase
+import os.path
+import tempfile
+import limelight.benchmark as b
+
+
+class TestBenchmark(TestCase):
+
+    def test_run(self):
+        calls = []
+        target = b.Benchmark('append', lambda: calls.append(1), 1)
+
+        actual = target.run(warmup=2, repeat=3)
+
+        self.assertEqual(len(actual.seconds), 3)
+        self.assertEqual(len(calls), 6)
+
+
+class TestBenchmarkSuite(TestCase):
+
+    def test_compare(self):
+        baseline = [b.BenchmarkResult('a', 10, [1.0], 0),
+                    b.BenchmarkResult('b', 10, [1.0], 0)]
+        results = [b.BenchmarkResult('a', 20, [2.1], 0),
+                   b.BenchmarkResult('b', 20, [2.4], 0),
+                   b.BenchmarkResult('c', 20, [9.0], 0)]
+
+        actual = b.BenchmarkSuite.compare(results, baseline, tolerance=0.1)
+
+        self.assertEqual([regression.name for regression in actual], ['b'])
+
+    def test_save_and_load(self):
+        results = [b.BenchmarkResult('a', 10, [1.0, 2.0], 5)]
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'results.json')
+            b.BenchmarkSuite.save(results, filename)
+
+            self.assertEqual(b.BenchmarkSuite.load(filename), results)
+
+    def test_from_dict(self):
+        source = {'name': 'a', 'items': 10, 'seconds': [1.0],
+                  'peak_memory': 5}
+
+        actual = b.BenchmarkResult.from_dict(source)
+
+        self.assertEqual(actual.peak_python_memory, 5)
+        self.assertIn('peak_python_memory', actual.return_as_dict())
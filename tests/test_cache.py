@@ -0,0 +1,104 @@
+from unittest import TestCase
+import json
+import os
+import os.path
+import tempfile
+import limelight.archive as a
+import limelight.cache as c
+import limelight.news as n
+import limelight.normalizer as nm
+from limelight.theme import Theme
+
+
+class TestFingerprint(TestCase):
+
+    def test_parameters(self):
+        self.assertEqual(
+            c.Fingerprint('a').add_value('x', 1).hexdigest(),
+            c.Fingerprint('a').add_value('x', 1).hexdigest())
+        self.assertNotEqual(
+            c.Fingerprint('a').add_value('x', 1).hexdigest(),
+            c.Fingerprint('a').add_value('x', 2).hexdigest())
+        self.assertNotEqual(
+            c.Fingerprint('a').hexdigest(),
+            c.Fingerprint('b').hexdigest())
+
+    def test_sources(self):
+        with tempfile.TemporaryDirectory() as directory:
+
+            class SourceFingerprint(c.Fingerprint):
+                PACKAGE_DIRECTORY = directory
+
+            filename = os.path.join(directory, 'vectorizer.py')
+            with open(filename, 'w') as f:
+                f.write('FEATURES = 1\n')
+            before = SourceFingerprint('a').hexdigest()
+            with open(filename, 'w') as f:
+                f.write('FEATURES = 2\n')
+            c.get_source_digest.cache_clear()
+
+            self.assertNotEqual(SourceFingerprint('a').hexdigest(), before)
+
+    def test_manifest_normalizer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pack = os.path.join(directory, 'pack')
+            a.DocumentPack.write(pack, [(Theme.SCI_SPACE, 1, b'orbit')])
+            manifest = os.path.join(directory, 'normalized.csv')
+            n.DataPointSources([n.DataPointSource(
+                pack,
+                n.DataPointMeta(n.DataPointId(1), Theme.SCI_SPACE))]) \
+                .save_csv(manifest)
+            digests = []
+            for quotes in [False, True]:
+                with open(os.path.join(
+                        pack, nm.MessageNormalizer.CONFIGURATION), 'w') as f:
+                    json.dump(nm.MessageNormalizer(quotes=quotes)
+                              .return_as_dict(), f)
+                digests.append(
+                    c.Fingerprint('a').add_manifest(manifest).hexdigest())
+
+            self.assertNotEqual(digests[0], digests[1])
+
+
+class TestArtifactCache(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = c.ArtifactCache(
+            os.path.join(self.directory.name, 'cache'), max_bytes=10)
+        self.location = os.path.join(self.directory.name, 'artifact')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, content: str):
+        with open(self.location, 'w') as f:
+            f.write(content)
+
+    def test_run(self):
+        fingerprint = c.Fingerprint('stage')
+        computed = []
+
+        def compute():
+            computed.append(True)
+            self.write('artifact')
+
+        self.assertFalse(self.cache.run(fingerprint, self.location, compute))
+        os.remove(self.location)
+        self.assertTrue(self.cache.run(fingerprint, self.location, compute))
+
+        self.assertEqual(len(computed), 1)
+        with open(self.location) as f:
+            self.assertEqual(f.read(), 'artifact')
+
+    def test_evict(self):
+        first = c.Fingerprint('first')
+        second = c.Fingerprint('second')
+        self.write('123456')
+        self.cache.store(first, self.location)
+        os.utime(os.path.join(self.cache.directory, first.hexdigest()),
+                 (0, 0))
+        self.cache.store(second, self.location)
+
+        self.assertFalse(self.cache.restore(first, self.location))
+        self.assertTrue(self.cache.restore(second, self.location))
@@ -0,0 +1,97 @@
+from unittest import TestCase
+import glob
+import os
+import os.path
+import tempfile
+import numpy as np
+import torch
+import torch.utils.data as tud
+import limelight.checkpoint as ch
+from limelight.classifier import MlpClassifier, PreTrainedTextVecMlpClassifier
+from limelight.dataset import MatrixRowCollator
+
+
+class TestCheckpointer(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        random = np.random.default_rng(0)
+        self.matrix = random.random((20, 6)).astype(np.float32)
+        self.labels = random.integers(0, 20, 20)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def train(self, resume=False, keep=100) -> MlpClassifier:
+        torch.manual_seed(1)
+        classifier = MlpClassifier(6, 20, 8, 0.5)
+        dataloader = tud.DataLoader(
+            range(20),
+            batch_size=4,
+            shuffle=True,
+            collate_fn=MatrixRowCollator(self.matrix, self.labels))
+        PreTrainedTextVecMlpClassifier(None, classifier).train(
+            dataloader, 2, 1e-2, vectorized=True,
+            checkpointer=ch.Checkpointer(self.directory.name, 2, keep),
+            resume=resume)
+        return classifier
+
+    def get_checkpoints(self):
+        return sorted(glob.glob(os.path.join(self.directory.name, '*.pt')))
+
+    def test_keep(self):
+        self.train(keep=2)
+        self.assertEqual(
+            [os.path.basename(f) for f in self.get_checkpoints()],
+            ['checkpoint-000001-000000004.pt',
+             'checkpoint-000002-000000000.pt'])
+
+    def test_resume(self):
+        expected = self.train().state_dict()
+        # Emulate runs stopped in the middle and at the end of an epoch.
+        for kept in [1, 3]:
+            for filename in self.get_checkpoints()[kept:]:
+                os.remove(filename)
+
+            actual = self.train(resume=True).state_dict()
+
+            for name, tensor in expected.items():
+                self.assertTrue(torch.equal(actual[name], tensor), name)
+
+    def test_load_latest_empty(self):
+        self.assertIsNone(ch.Checkpointer(self.directory.name).load_latest())
+
+    def test_close_on_error(self):
+        checkpointer = ch.Checkpointer(self.directory.name, 1)
+        dataloader = tud.DataLoader(range(8), batch_size=4,
+                                    collate_fn=self.fail_second_batch())
+
+        with self.assertRaises(RuntimeError):
+            PreTrainedTextVecMlpClassifier(
+                None, MlpClassifier(6, 20, 8, 0.5)).train(
+                    dataloader, 1, vectorized=True, checkpointer=checkpointer)
+
+        self.assertIsNone(checkpointer._thread)
+        self.assertEqual(len(self.get_checkpoints()), 1)
+
+    def fail_second_batch(self):
+        collator = MatrixRowCollator(self.matrix, self.labels)
+
+        def collate(indices):
+            if indices[0] > 0:
+                raise RuntimeError('stop')
+            return collator(indices)
+        return collate
+
+    def test_skip_batches(self):
+        dataloader = tud.DataLoader(range(8), batch_size=4, num_workers=1,
+                                    pin_memory=True, prefetch_factor=3,
+                                    persistent_workers=True)
+
+        actual = PreTrainedTextVecMlpClassifier._skip_batches(
+            dataloader, [[1, 2]], torch.Generator())
+
+        self.assertEqual(actual.prefetch_factor, 3)
+        self.assertTrue(actual.pin_memory)
+        self.assertTrue(actual.persistent_workers)
+        self.assertEqual(len(actual), 1)
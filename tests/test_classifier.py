@@ -0,0 +1,91 @@
+from unittest import TestCase
+import os.path
+import tempfile
+import numpy as np
+import torch
+import torch.utils.data as tud
+from greentea.text import Text, Texts
+import limelight.classifier as c
+from limelight.dataset import PairCollator
+from limelight.tokens import TokenIdEncoder
+from limelight.theme import Theme, Themes
+from limelight.vectorizer import \
+    HashedTfidfVectorizer, \
+    LogisticRegressionFsVectorizer
+
+
+class TestMlpClassifier(TestCase):
+
+    def test_forward(self):
+        target = c.MlpClassifier(5, 20)
+
+        actual = target(torch.zeros(3, 5))
+
+        self.assertEqual(actual.shape, (3, 20))
+
+    def test_round_trip(self):
+        texts = Texts([Text('orbit launch orbit'), Text('engine wheel'),
+                       Text('launch the orbit'), Text('wheel and engine')])
+        themes = Themes([Theme.SCI_SPACE, Theme.REC_AUTOS] * 2)
+        encoder = TokenIdEncoder(num_buckets=16).fit(texts)
+        target = c.PreTrainedTextVecMlpClassifier(
+            encoder,
+            c.EmbeddingBagClassifier(encoder.get_num_of_features(),
+                                     Theme.num_of_themes(),
+                                     embedding_dim=4))
+        target.train(tud.DataLoader(list(zip(texts, themes)),
+                                    batch_size=2,
+                                    collate_fn=PairCollator()),
+                     epochs=1)
+        expected = target.predict(texts)
+
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'model')
+            target.dump(filename)
+            loaded = c.PreTrainedTextVecMlpClassifier.load(filename)
+
+        self.assertIsInstance(loaded.classifier, c.EmbeddingBagClassifier)
+        self.assertEqual(expected.shape, (4,))
+        np.testing.assert_array_equal(loaded.predict(texts), expected)
+
+    def test_eval_disables_dropout(self):
+        target = c.MlpClassifier(5, 20, dropout_rate=0.5)
+        x = torch.ones(3, 5)
+
+        target.eval()
+
+        self.assertTrue(torch.equal(target(x), target(x)))
+
+
+class TestEmbeddingBagClassifier(TestCase):
+
+    def test_forward(self):
+        target = c.EmbeddingBagClassifier(10, 20, embedding_dim=4)
+        token_ids = torch.tensor([1, 2, 3, 9])
+        offsets = torch.tensor([0, 3, 3])
+
+        actual = target((token_ids, offsets))
+
+        self.assertEqual(actual.shape, (3, 20))
+
+
+class TestPreTrainedTextVecMlpClassifier(TestCase):
+
+    def test_update(self):
+        texts = Texts([Text('orbit launch'), Text('engine wheel')])
+        themes = Themes([Theme.SCI_SPACE, Theme.REC_AUTOS])
+        vectorizer = LogisticRegressionFsVectorizer.create(
+            HashedTfidfVectorizer(1 << 8).fit(texts), 2)
+        vectorizer.fit(texts, themes)
+        target = c.PreTrainedTextVecMlpClassifier(
+            vectorizer,
+            c.MlpClassifier(vectorizer.get_num_of_features(),
+                            Theme.num_of_themes()))
+        support = vectorizer.select_from_model.get_support().copy()
+
+        target.update(texts, themes, epochs=1)
+
+        self.assertEqual(vectorizer.vectorizer.num_of_documents, 4)
+        np.testing.assert_array_equal(
+            vectorizer.select_from_model.get_support(), support)
+        self.assertEqual(target.predict(texts).shape, (2,))
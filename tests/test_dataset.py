@@ -1,6 +1,10 @@
 from unittest import TestCase
+from collections.abc import Sequence
 from unittest.mock import MagicMock
 import os.path
+import tempfile
+import numpy as np
+import torch
 from greentea.text import Text
 import torch.utils.data as ud
 import limelight.dataset as d
@@ -22,6 +26,29 @@ class TestDataPointSource(TestCase):
             Text,
             "Ignore bytes that utf-8 codec can't decode")
 
+    def test_read_many(self):
+        dirname = os.path.dirname(__file__)
+        meta = d.DataPointMeta(
+            d.DataPointId(51865), t.Theme.COMP_SYS_MAC_HARDWARE)
+        source = d.DataPointSource(dirname, meta)
+
+        actual = d.DataPointSources([source, source]).read_many(1, 2)
+
+        self.assertEqual(actual.raw_texts(),
+                         [source.read_text().text] * 2)
+
+    def test_iter_texts(self):
+        dirname = os.path.dirname(__file__)
+        meta = d.DataPointMeta(
+            d.DataPointId(51865), t.Theme.COMP_SYS_MAC_HARDWARE)
+        source = d.DataPointSource(dirname, meta)
+
+        actual = d.DataPointSources([source, source]).iter_texts(1, 2)
+
+        self.assertNotIsInstance(actual, Sequence)
+        self.assertEqual([text.text for text in actual],
+                         [source.read_text().text] * 2)
+
 
 class TestDataPointMeta(TestCase):
 
@@ -45,6 +72,19 @@ class TestDataPoint(TestCase):
         sources = d.DataPointSources.read_csv(self.dataset)
 
         self.assertIsInstance(sources, d.DataPointSources)
+        self.assertIsNone(sources[0].size, 'The size column is optional.')
+
+    def test_save_csv_size(self):
+        meta = d.DataPointMeta(d.DataPointId(1), t.Theme.SCI_SPACE)
+        sources = d.DataPointSources([d.DataPointSource('a', meta, 10),
+                                      d.DataPointSource('b', meta)])
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'sources.csv')
+            sources.save_csv(filename)
+
+            actual = d.DataPointSources.read_csv(filename)
+
+        self.assertEqual(list(actual), list(sources))
 
 
 class TestDataset(TestCase):
@@ -60,6 +100,65 @@ class TestDataset(TestCase):
     def test_transformer(self):
         self.assertEqual(list(self.dataset), ['a', 'b'])
 
+    def test_prefetch(self):
+        self.assertEqual(list(self.dataset.prefetch(1)), ['a', 'b'])
+
+    def test_train_test_split_groups(self):
+        meta = d.DataPointMeta(d.DataPointId(1), t.Theme.SCI_SPACE)
+        dataset = d.Dataset(
+            d.DataPointSources([d.DataPointSource(str(i), meta)
+                                for i in range(8)]),
+            lambda x: x.directory)
+        groups = np.asarray([0, 0, 2, 2, 4, 4, 6, 6])
+
+        train, test = dataset.train_test_split(0, groups)
+
+        self.assertEqual(len(train) + len(test), 8)
+        for side in [train, test]:
+            members = [int(source.directory) for source in side.sources]
+            for member in members:
+                self.assertIn(member ^ 1, members)
+
     def test_loader(self):
         loader = ud.DataLoader(self.dataset, batch_size=2)
         self.assertEqual(list(loader), [['a', 'b']])
+
+
+class TestBudgetBatchSampler(TestCase):
+
+    def setUp(self):
+        self.lengths = np.asarray([5, 1, 9, 3, 4, 2, 20, 6])
+
+    def test_budget(self):
+        torch.manual_seed(0)
+        target = d.BudgetBatchSampler(self.lengths, 10, bucket_size=4)
+
+        batches = list(target)
+
+        self.assertEqual(sorted(sum(batches, [])), list(range(8)))
+        for batch in batches:
+            self.assertTrue(len(batch) == 1
+                            or self.lengths[batch].sum() <= 10)
+
+    def test_no_shuffle(self):
+        target = d.BudgetBatchSampler(self.lengths, 10, shuffle=False)
+
+        self.assertEqual(list(target),
+                         [[0, 1], [2], [3, 4, 5], [6], [7]])
+
+    def test_len(self):
+        torch.manual_seed(0)
+        dataloader = ud.DataLoader(
+            range(8),
+            batch_sampler=d.BudgetBatchSampler(self.lengths, 10,
+                                               bucket_size=4))
+
+        for _ in range(3):
+            self.assertEqual(len(dataloader), len(list(dataloader)))
+
+    def test_bucketing(self):
+        target = d.BudgetBatchSampler(
+            self.lengths, 10, bucket_size=4, shuffle=False)
+
+        self.assertEqual(list(target),
+                         [[1, 3, 0], [2], [5, 4], [7], [6]])
@@ -0,0 +1,81 @@
+from unittest import TestCase
+import numpy as np
+import numpy.testing as npt
+from greentea.text import Text
+import limelight.dedup as dd
+import limelight.news as n
+from limelight.theme import Theme
+
+
+class TestMinHasher(TestCase):
+
+    def test_get_signature(self):
+        target = dd.MinHasher()
+        words = [f'w{i}' for i in range(200)]
+        edited = words[:100] + ['x'] + words[101:]
+        other = [f'v{i}' for i in range(200)]
+
+        signature = target.get_signature(Text(' '.join(words)))
+
+        self.assertGreater(np.mean(
+            signature == target.get_signature(Text(' '.join(edited)))), 0.8)
+        self.assertLess(np.mean(
+            signature == target.get_signature(Text(' '.join(other)))), 0.1)
+
+    def test_short_text(self):
+        target = dd.MinHasher()
+        self.assertEqual(target.get_signature(Text('')).shape, (128,))
+        self.assertEqual(target.get_signature(Text('ab cd')).shape, (128,))
+
+
+class TestUnionFind(TestCase):
+
+    def test_union(self):
+        target = dd.UnionFind(5)
+
+        target.union(3, 4)
+        target.union(4, 1)
+
+        npt.assert_array_equal(target.get_labels(), [0, 1, 2, 1, 1])
+
+
+class TestDeduplicator(TestCase):
+
+    def test_cluster_signatures(self):
+        random = np.random.default_rng(0)
+        signatures = random.integers(0, 1 << 32, (4, 128), dtype=np.uint64)
+        signatures[2] = signatures[0]
+        signatures[2, :10] += 1
+
+        labels = dd.Deduplicator(0.8).cluster_signatures(signatures)
+
+        npt.assert_array_equal(labels, [0, 1, 0, 3])
+        npt.assert_array_equal(dd.Deduplicator.get_representatives(labels),
+                               [0, 1, 3])
+
+    def test_large_bucket(self):
+        random = np.random.default_rng(0)
+        signatures = random.integers(0, 1 << 32, (6, 128), dtype=np.uint64)
+        # All share the first band, and the near-duplicates share no other.
+        signatures[:, :8] = signatures[0, :8]
+        for original, duplicate in [(1, 2), (3, 4)]:
+            signatures[duplicate] = signatures[original]
+            signatures[duplicate, 8::8] += 1
+        target = dd.Deduplicator(0.8)
+        target.MAX_PAIRWISE = 2
+
+        labels = target.cluster_signatures(signatures)
+
+        npt.assert_array_equal(labels, [0, 1, 1, 3, 3, 5])
+
+    def test_report(self):
+        meta = n.DataPointMeta(n.DataPointId(1), Theme.SCI_SPACE)
+        sources = n.DataPointSources(
+            [n.DataPointSource('a', meta, size) for size in [10, 20, 30]])
+
+        actual = dd.Deduplicator.report(sources, np.asarray([0, 1, 0])) \
+            .return_as_dict()
+
+        self.assertEqual(actual['removed_documents'], 1)
+        self.assertEqual(actual['removed_bytes'], 30)
+        self.assertEqual(actual['removed_fraction'], 0.5)
@@ -0,0 +1,66 @@
+from unittest import TestCase
+import os.path
+import tempfile
+import numpy as np
+import numpy.testing as npt
+import torch.utils.data as tud
+import limelight.classifier as c
+import limelight.dataset as d
+import limelight.evaluation as e
+import limelight.synthetic as s
+import limelight.vectorizer as v
+from limelight.theme import Theme, Themes
+
+
+class TestConfusionMatrix(TestCase):
+
+    def setUp(self):
+        self.target = e.ConfusionMatrix(3)
+        self.target.update(np.array([0, 0, 1]), np.array([0, 1, 1]))
+        self.target.update(np.array([2, 2]), np.array([2, 0]))
+
+    def test_accuracy(self):
+        self.assertAlmostEqual(self.target.get_accuracy(), 3 / 5)
+
+    def test_precision(self):
+        npt.assert_allclose(self.target.get_precision(), [1 / 2, 1 / 2, 1])
+
+    def test_recall(self):
+        npt.assert_allclose(self.target.get_recall(), [1 / 2, 1, 1 / 2])
+
+    def test_empty(self):
+        self.assertEqual(e.ConfusionMatrix().get_accuracy(), 0)
+
+
+class TestEvaluator(TestCase):
+
+    def test_evaluate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            corpus = os.path.join(directory, 'corpus')
+            s.SyntheticCorpus(100, mean_length=30).write(corpus)
+            sources = d.Dataset.create(corpus).sources
+            texts = sources.read_many()
+            themes = Themes([source.get_theme() for source in sources])
+            base = v.TfidfVectorizer()
+            base.fit(texts)
+            vectorizer = v.LogisticRegressionFsVectorizer.create(base, 50)
+            vectorizer.fit(texts, themes)
+            model = c.PreTrainedTextVecMlpClassifier(
+                vectorizer,
+                c.MlpClassifier(vectorizer.get_num_of_features(),
+                                Theme.num_of_themes(), 8))
+            model.train(tud.DataLoader(list(zip(texts, themes)),
+                                       batch_size=16,
+                                       collate_fn=d.PairCollator()),
+                        epochs=1)
+            filename = os.path.join(directory, 'model')
+            model.dump(filename)
+
+            actual = e.Evaluator(filename, 16, 1).evaluate(sources)
+
+        expected = np.mean(model.predict(texts) == themes.get_index())
+        self.assertEqual(actual['documents'], 100)
+        self.assertAlmostEqual(actual['accuracy'], expected)
+        self.assertEqual(set(actual['themes']),
+                         {theme.get_theme_name() for theme in Theme})
+        self.assertEqual(np.asarray(actual['confusion_matrix']).sum(), 100)
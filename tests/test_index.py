@@ -0,0 +1,89 @@
+from unittest import TestCase
+import os.path
+import tempfile
+from greentea.text import Text, Texts
+import limelight.index as i
+import limelight.news as n
+import limelight.theme as t
+import limelight.vectorizer as v
+
+
+class TestSimilarDocumentIndex(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        theme = t.Theme.SCI_SPACE
+        os.mkdir(os.path.join(self.directory.name, theme.get_theme_name()))
+        self.documents = ['rocket launch orbit',
+                          'orbit of the moon',
+                          'baseball pitcher',
+                          'hockey goalie']
+        sources = []
+        for point_id, document in enumerate(self.documents):
+            path = os.path.join(self.directory.name,
+                                theme.get_theme_name(),
+                                str(point_id))
+            with open(path, 'w') as f:
+                f.write(document)
+            sources.append(n.DataPointSource(
+                self.directory.name,
+                n.DataPointMeta(n.DataPointId(point_id), theme)))
+        self.sources = n.DataPointSources(sources)
+        vectorizer = v.TfidfVectorizer()
+        vectorizer.fit(Texts([Text(d) for d in self.documents]))
+        self.index = i.SimilarDocumentIndex(vectorizer, num_tables=16)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_incremental_add(self):
+        self.index.add(self.sources[:2])
+        self.index.add(self.sources[2:])
+        self.assertEqual(len(self.index), 4)
+
+    def test_query_finds_itself(self):
+        self.index.add(self.sources, batch_size=3)
+
+        actual = self.index.query(Texts([Text('rocket launch orbit')]), 1)
+
+        self.assertEqual(actual[0][0].source, self.sources[0])
+        self.assertAlmostEqual(actual[0][0].similarity, 1, places=5)
+
+    def test_exact_query(self):
+        self.index.add(self.sources)
+
+        actual = self.index.exact_query(Texts([Text('orbit')]), 2)
+
+        self.assertEqual([neighbour.source for neighbour in actual[0]],
+                         [self.sources[0], self.sources[1]])
+
+    def test_benchmark(self):
+        self.index.add(self.sources)
+
+        actual = self.index.benchmark(
+            Texts([Text(d) for d in self.documents]), 1)
+
+        self.assertEqual(actual.recall, 1.0)
+
+    def test_dump_and_load(self):
+        self.index.add(self.sources)
+        filename = os.path.join(self.directory.name, 'index')
+        self.index.dump(filename)
+
+        actual = i.SimilarDocumentIndex.load(filename)
+
+        self.assertEqual(len(actual), 4)
+
+    def test_check_vectorizer(self):
+        filename = os.path.join(self.directory.name, 'vectorizer')
+        other = os.path.join(self.directory.name, 'other')
+        self.index.vectorizer.dump(filename)
+        v.TfidfVectorizer().dump(other)
+        target = i.SimilarDocumentIndex(
+            self.index.vectorizer,
+            vectorizer_digest=i.SimilarDocumentIndex.get_digest(filename))
+
+        target.check_vectorizer(filename)
+        self.index.check_vectorizer(other)
+        with self.assertRaises(ValueError):
+            target.check_vectorizer(other)
@@ -0,0 +1,49 @@
+from unittest import TestCase
+import os.path
+import tempfile
+import warnings
+import torch
+import limelight.classifier as c
+import limelight.inference as e
+
+
+class TestInference(TestCase):
+
+    def test_freeze(self):
+        for classifier in [c.MlpClassifier(5, 20),
+                           c.EmbeddingBagClassifier(10, 20, 4)]:
+            frozen = e.freeze(classifier)
+            example = e.create_example_input(classifier, 3, 4)
+
+            self.assertTrue(classifier.training)
+            classifier.eval()
+            with torch.no_grad():
+                expected = classifier(example)
+
+            self.assertTrue(torch.allclose(frozen(example), expected,
+                                           atol=1e-6))
+
+    def test_export(self):
+        classifier = c.MlpClassifier(5, 20)
+        example = torch.rand(2, 5)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'classifier.pt')
+            e.export(classifier, filename)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', FutureWarning)
+                loaded = torch.jit.load(filename)
+
+        classifier.eval()
+        with torch.no_grad():
+            expected = classifier(example)
+        self.assertTrue(torch.allclose(loaded(example), expected, atol=1e-6))
+
+    def test_measure_latency(self):
+        classifier = c.MlpClassifier(5, 20)
+
+        actual = e.measure_latency(
+            classifier, e.freeze(classifier), [1, 4], warmup=0, repeat=1)
+
+        self.assertEqual([result.name for result in actual],
+                         ['eager/1', 'frozen/1', 'eager/4', 'frozen/4'])
+        self.assertTrue(classifier.training)
@@ -0,0 +1,83 @@
+import json
+import os.path
+import tempfile
+from unittest import TestCase
+from greentea.text import Text
+import limelight.news as n
+import limelight.normalizer as nm
+from limelight.theme import Theme
+
+
+MESSAGE = '''From: bob@example.com
+Subject: Re: orbits
+Organization: NASA
+ Goddard
+
+In article <1@example.com> alice@example.com writes:
+> Is the orbit stable?
+I think the orbit is stable.
+Yes really.
+
+--
+Bob
+bob@example.com'''
+
+
+class TestMessageNormalizer(TestCase):
+
+    def test_call(self):
+        self.assertEqual(nm.MessageNormalizer()(Text(MESSAGE)).text,
+                         'I think the orbit is stable.\nYes really.')
+
+    def test_keep(self):
+        self.assertEqual(
+            nm.MessageNormalizer(True, (), True, True)(Text(MESSAGE)).text,
+            MESSAGE)
+        self.assertEqual(
+            nm.MessageNormalizer(header_fields=['Subject'])(
+                Text(MESSAGE)).text,
+            'Subject: Re: orbits\n\n'
+            'I think the orbit is stable.\nYes really.')
+
+    def test_max_tokens(self):
+        self.assertEqual(
+            nm.MessageNormalizer(max_tokens=6)(Text(MESSAGE)).text,
+            'I think the orbit is stable.\nYes')
+        self.assertEqual(
+            nm.MessageNormalizer(max_tokens=0)(Text(MESSAGE)).text, '')
+
+    def test_long_tail(self):
+        text = 'body\n--\n' + '\n'.join(['line'] * 20)
+        self.assertEqual(nm.MessageNormalizer()(Text(text)).text, text)
+
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            os.makedirs(os.path.join(directory, 'raw', 'sci.space'))
+            for point_id in [2, 1]:
+                with open(os.path.join(directory, 'raw', 'sci.space',
+                                       str(point_id)), 'w') as f:
+                    f.write(f'{MESSAGE}\n{point_id}')
+            sources = n.DataPointSources(
+                [n.DataPointSource(
+                    os.path.join(directory, 'raw'),
+                    n.DataPointMeta(n.DataPointId(point_id),
+                                    Theme.SCI_SPACE))
+                 for point_id in [2, 1]])
+            location = os.path.join(directory, 'normalized')
+
+            actual = nm.MessageNormalizer(signatures=True).write(
+                sources, location)
+
+            self.assertEqual([source.directory for source in actual],
+                             [location] * 2)
+            self.assertTrue(actual[0].read_text().text.endswith('com\n2'))
+            self.assertEqual(actual[1].get_size(),
+                             len(actual[1].read_text().text))
+            with open(os.path.join(location,
+                                   nm.MessageNormalizer.CONFIGURATION)) as f:
+                self.assertEqual(
+                    nm.MessageNormalizer.from_dict(json.load(f))
+                    .return_as_dict(),
+                    nm.MessageNormalizer(signatures=True).return_as_dict())
+            with self.assertRaises(ValueError):
+                nm.MessageNormalizer().write(actual, location)
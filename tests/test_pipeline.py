@@ -0,0 +1,47 @@
+from unittest import TestCase, mock
+import os
+import os.path
+import tempfile
+import limelight.dataset as d
+import limelight.pipeline as p
+import limelight.theme as t
+import limelight.vectorizer as v
+
+
+class TestPipeline(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.corpus = os.path.join(self.directory.name, 'corpus')
+        for theme in t.Theme:
+            theme_dir = os.path.join(self.corpus, theme.get_theme_name())
+            os.makedirs(theme_dir)
+            for point_id in range(4):
+                with open(os.path.join(theme_dir, str(point_id)), 'w') as f:
+                    f.write(f'{theme.name.lower()} news {point_id}')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_run(self):
+        output = os.path.join(self.directory.name, 'output')
+        target = p.Pipeline(output, max_features=10, epochs=1)
+
+        target.run(d.Dataset.create(self.corpus))
+
+        artifacts = p.PipelineArtifacts(output)
+        for filename in [artifacts.get_train(),
+                         artifacts.get_test(),
+                         artifacts.get_sparse_vectorizer(),
+                         artifacts.get_feature_selected_vectorizer(),
+                         artifacts.get_model()]:
+            self.assertTrue(os.path.exists(filename), filename)
+
+    def test_vectorize_once(self):
+        output = os.path.join(self.directory.name, 'output')
+        target = p.Pipeline(output, max_features=10, epochs=1)
+
+        with mock.patch.object(v.TfidfVectorizer, 'transform') as transform:
+            target.run(d.Dataset.create(self.corpus))
+
+        transform.assert_not_called()
@@ -0,0 +1,28 @@
+from unittest import TestCase
+import threading
+import limelight.prefetch as p
+
+
+class TestPrefetcher(TestCase):
+
+    def test_order(self):
+        actual = list(p.Prefetcher(3, 4).map(lambda x: x * 2, range(10)))
+        self.assertEqual(actual, [x * 2 for x in range(10)])
+
+    def test_read_ahead(self):
+        lock = threading.Lock()
+        started = []
+
+        def record(x):
+            with lock:
+                started.append(x)
+            return x
+
+        iterator = p.Prefetcher(2, 1).map(record, range(10))
+        self.assertEqual(next(iterator), 0)
+        iterator.close()
+        self.assertLessEqual(len(started), 3)
+
+    def test_invalid_read_ahead(self):
+        with self.assertRaises(ValueError):
+            p.Prefetcher(0)
@@ -0,0 +1,45 @@
+from unittest import TestCase
+import json
+import limelight.profiling as p
+
+
+class Counter:
+
+    @p.profiled('Counter.count', p.count_first_argument)
+    def count(self, items):
+        return len(items)
+
+
+class TestProfiler(TestCase):
+
+    def setUp(self):
+        p.PROFILER.reset()
+
+    def tearDown(self):
+        p.PROFILER.disable()
+        p.PROFILER.reset()
+
+    def test_disabled(self):
+        self.assertEqual(Counter().count([1, 2]), 2)
+        with p.PROFILER.timer('stage'):
+            pass
+        self.assertEqual(p.PROFILER.return_as_dict(), {})
+
+    def test_enabled(self):
+        p.PROFILER.enable()
+        Counter().count([1, 2])
+        Counter().count([3])
+        with p.PROFILER.timer('stage', 4):
+            pass
+        report = json.loads(p.PROFILER.to_json())
+        self.assertEqual(report['Counter.count']['calls'], 2)
+        self.assertEqual(report['Counter.count']['items'], 3)
+        self.assertEqual(report['stage']['items'], 4)
+
+    def test_to_prometheus(self):
+        p.PROFILER.record('stage', 0.5, 10)
+        text = p.PROFILER.to_prometheus()
+        self.assertIn('# TYPE limelight_stage_seconds_total counter', text)
+        self.assertIn('limelight_stage_seconds_total{stage="stage"} 0.5',
+                      text)
+        self.assertIn('limelight_stage_items_total{stage="stage"} 10', text)
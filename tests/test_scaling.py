@@ -0,0 +1,62 @@
+from unittest import TestCase, mock
+import json
+import os
+import os.path
+import tempfile
+import limelight.scaling as s
+
+
+class TestTabulate(TestCase):
+
+    def test_exponent(self):
+        measurements = [s.StageMeasurement('train', 100, 1.0, 1 << 20),
+                        s.StageMeasurement('split', 100, 0.5, 1 << 20),
+                        s.StageMeasurement('train', 1000, 100.0, 2 << 20)]
+
+        lines = s.tabulate(measurements).split('\n')
+
+        self.assertEqual(lines[0].split(),
+                         ['stage', 'documents', 'seconds', 'peak', 'MiB',
+                          'exponent'])
+        self.assertEqual(lines[1].split(),
+                         ['train', '100', '1.00', '1.0'])
+        self.assertEqual(lines[3].split(),
+                         ['train', '1000', '100.00', '2.0', '2.00'])
+
+
+class TestSave(TestCase):
+
+    def test_save(self):
+        measurement = s.StageMeasurement('split', 10, 0.25, 1024)
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'scaling.json')
+
+            s.save([measurement], filename)
+
+            with open(filename) as f:
+                self.assertEqual(json.load(f),
+                                 [{'stage': 'split',
+                                   'documents': 10,
+                                   'seconds': 0.25,
+                                   'peak_rss': 1024}])
+
+
+class TestScalingHarness(TestCase):
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = os.path.join(directory, 'cache')
+            target = s.ScalingHarness(directory, [60], max_features=50)
+
+            with mock.patch.dict(os.environ, {'LIMELIGHT_CACHE_DIR': cache}):
+                actual = target.run()
+
+            self.assertEqual([m.stage for m in actual],
+                             s.ScalingHarness.STAGES)
+            for measurement in actual:
+                self.assertEqual(measurement.documents, 60)
+                self.assertGreater(measurement.seconds, 0)
+                self.assertGreater(measurement.peak_rss, 0)
+            self.assertFalse(os.path.exists(cache))
+            self.assertTrue(os.path.exists(
+                os.path.join(directory, '60', 'model')))
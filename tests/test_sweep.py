@@ -0,0 +1,74 @@
+from unittest import TestCase
+import json
+import os.path
+import tempfile
+import limelight.dataset as d
+import limelight.news as n
+import limelight.sweep as s
+import limelight.synthetic as sy
+import limelight.theme as t
+
+
+class TestSweepConfig(TestCase):
+
+    def test_create_grid(self):
+        actual = s.SweepConfig.create_grid([10, 20], [8], [0.1, 0.2], [1e-3])
+
+        self.assertEqual(len(actual), 4)
+        self.assertIn(s.SweepConfig(20, 8, 0.1, 1e-3), actual)
+
+
+class TestSweep(TestCase):
+
+    def test_split(self):
+        sources = n.DataPointSources([
+            n.DataPointSource('a', n.DataPointMeta(n.DataPointId(i), theme))
+            for theme in [t.Theme.SCI_MED, t.Theme.SCI_SPACE]
+            for i in range(3)])
+        with tempfile.TemporaryDirectory() as directory:
+            target = s.Sweep(directory, [], num_folds=3, seed=0)
+
+            folds = target.split(d.Dataset(sources, lambda x: x))
+
+            self.assertEqual(len(folds), 3)
+            for fold in folds:
+                test = n.DataPointSources.read_csv(fold.get_test())
+                self.assertEqual(
+                    sorted(source.get_theme().value for source in test),
+                    [t.Theme.SCI_MED.value, t.Theme.SCI_SPACE.value])
+
+    def test_summarize(self):
+        config = s.SweepConfig(10, 8, 0.1, 1e-3)
+        target = s.Sweep('directory', [config])
+
+        actual = target.summarize([
+            {'config': config.return_as_dict(), 'accuracy': 0.5},
+            {'config': config.return_as_dict(), 'accuracy': 0.7}])
+
+        self.assertAlmostEqual(actual['summary'][0]['mean_accuracy'], 0.6)
+
+    def test_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            corpus = os.path.join(directory, 'corpus')
+            sy.SyntheticCorpus(120, mean_length=30).write(corpus)
+            configs = s.SweepConfig.create_grid([50, 100], [8], [0.1], [1e-2])
+            target = s.Sweep(os.path.join(directory, 'sweep'), configs,
+                             num_folds=2, epochs=1, max_workers=1, seed=0)
+
+            target.run(d.Dataset.create(corpus))
+
+            with open(os.path.join(directory, 'sweep', 'report.json')) as f:
+                report = json.load(f)
+            self.assertEqual([item['config'] for item in report['summary']
+                              if item['config']['max_features'] == 50],
+                             [configs[0].return_as_dict()])
+            self.assertEqual(len(report['summary']), 2)
+            self.assertEqual(len(report['jobs']), 4)
+            for job in report['jobs']:
+                self.assertEqual(set(job), {'fold', 'config', 'accuracy'})
+                self.assertGreaterEqual(job['accuracy'], 0)
+                self.assertLessEqual(job['accuracy'], 1)
+            folds = sorted({job['fold'] for job in report['jobs']})
+            for fold in folds:
+                s._evaluate(s.Fold(fold), configs[0], 1, 32)
+            self.assertEqual(list(s._MATRICES), [folds[-1]])
@@ -0,0 +1,25 @@
+from unittest import TestCase
+import tempfile
+import numpy.testing as npt
+import limelight.dataset as d
+import limelight.synthetic as s
+
+
+class TestSyntheticCorpus(TestCase):
+
+    def test_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            s.SyntheticCorpus(50, mean_length=20).write(directory)
+
+            dataset = d.Dataset.create(directory)
+
+            self.assertEqual(len(dataset), 50)
+            self.assertTrue(dataset.sources[0].read_text().text)
+
+    def test_theme_probabilities(self):
+        uniform = s.SyntheticCorpus(1).get_theme_probabilities()
+        skewed = s.SyntheticCorpus(1, skew=1.0).get_theme_probabilities()
+
+        npt.assert_allclose(uniform, 1 / 20)
+        self.assertGreater(skewed[0], skewed[-1])
+        self.assertAlmostEqual(skewed.sum(), 1)
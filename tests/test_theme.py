@@ -1,6 +1,7 @@
 from unittest import TestCase
 import numpy as np
 import numpy.testing as npt
+import torch
 import limelight.theme as t
 
 
@@ -10,6 +11,10 @@ class TestTheme(TestCase):
         actual = t.Theme.create('talk.politics.mideast')
         self.assertEqual(actual, t.Theme.TALK_POLITICS_MIDEAST)
 
+    def test_create_unknown(self):
+        with self.assertRaises(ValueError):
+            t.Theme.create('talk.politics')
+
     def test_get_theme_list(self):
         actual = t.Theme.get_themename_list()
         self.assertEqual(len(actual), 20)
@@ -41,3 +46,29 @@ class TestThemes(TestCase):
         npt.assert_equal(
             actual,
             expected)
+
+    def test_get_sparse_index_matrix(self):
+        themes = t.Themes([t.Theme.TALK_POLITICS_GUNS, t.Theme.SCI_MED])
+
+        actual = themes.get_sparse_index_matrix()
+
+        npt.assert_equal(actual.toarray(), themes.get_index_matrix())
+
+    def test_as_torch_tensor(self):
+        themes = t.Themes([t.Theme.SCI_MED, t.Theme.REC_AUTOS])
+
+        actual = themes.as_torch_tensor()
+
+        self.assertEqual(actual.dtype, torch.int64)
+        self.assertEqual(actual.tolist(), [8, 1])
+        themes.values[0] = 3
+        self.assertEqual(actual[0].item(), 3, 'The memory is shared.')
+
+    def test_getitem(self):
+        themes = t.Themes(np.asarray([8, 1, 15]))
+
+        self.assertEqual(themes[1], t.Theme.REC_AUTOS)
+        self.assertEqual(themes[1:],
+                         t.Themes([t.Theme.REC_AUTOS,
+                                   t.Theme.TALK_POLITICS_GUNS]))
+        self.assertEqual(list(themes)[0], t.Theme.SCI_MED)
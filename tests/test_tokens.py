@@ -0,0 +1,104 @@
+from unittest import TestCase
+import tempfile
+import numpy as np
+import numpy.testing as npt
+import sklearn.feature_extraction.text as s
+from greentea.text import Text, Texts
+import limelight.theme as t
+import limelight.tokens as k
+
+
+class TestTokenizedCorpus(TestCase):
+
+    def setUp(self):
+        self.texts = Texts([Text('a cat and a dog'), Text('Dog dog')])
+
+    def test_build(self):
+        actual = k.TokenizedCorpus.build(self.texts)
+
+        self.assertEqual(actual.vocabulary, ['cat', 'and', 'dog'])
+        npt.assert_array_equal(actual.tokens, [0, 1, 2, 2, 2])
+        npt.assert_array_equal(actual.offsets, [0, 3, 5])
+
+    def test_save_and_load(self):
+        themes = t.Themes([t.Theme.SCI_MED, t.Theme.SCI_SPACE])
+        corpus = k.TokenizedCorpus.build(self.texts, themes)
+        with tempfile.TemporaryDirectory() as directory:
+            corpus.save(directory)
+            actual = k.TokenizedCorpus.load(directory)
+
+            self.assertIsInstance(actual.tokens, np.memmap)
+            npt.assert_array_equal(actual.tokens, corpus.tokens)
+            self.assertEqual(actual.vocabulary, corpus.vocabulary)
+            self.assertEqual(actual.get_themes(), themes)
+
+
+class TestCorpusTfidfVectorizer(TestCase):
+
+    def setUp(self):
+        self.documents = ['The cat sat on the mat.',
+                          'the dog ate the cat',
+                          'a Mat, a dog; dogs!',
+                          '']
+        self.queries = ['the cat ate a mat unknown dog cat', 'sat on']
+
+    def assert_same_as_sklearn(self, **kwargs):
+        expected = s.TfidfVectorizer(**kwargs).fit(self.documents)
+        target = k.CorpusTfidfVectorizer(**kwargs)
+        target.fit(k.TokenizedCorpus.build(
+            Texts([Text(d) for d in self.documents])))
+
+        actual = target.transform(Texts([Text(q) for q in self.queries]))
+
+        self.assertEqual(target.get_num_of_features(),
+                         len(expected.vocabulary_))
+        npt.assert_allclose(
+            np.sort(actual.raw().toarray(), axis=1),
+            np.sort(expected.transform(self.queries).toarray(), axis=1),
+            atol=1e-6)
+
+    def test_unigram(self):
+        self.assert_same_as_sklearn()
+
+    def test_document_frequency(self):
+        self.assert_same_as_sklearn(min_df=2, max_df=0.7)
+
+    def test_ngram(self):
+        self.assert_same_as_sklearn(ngram_range=(1, 3))
+
+    def test_transform_corpus(self):
+        texts = Texts([Text(d) for d in self.documents])
+        target = k.CorpusTfidfVectorizer(ngram_range=(1, 2))
+        target.fit(texts)
+
+        actual = target.transform(k.TokenizedCorpus.build(texts[::-1]))
+
+        npt.assert_allclose(actual.raw().toarray(),
+                            target.transform(texts[::-1]).raw().toarray())
+
+
+class TestTokenIdEncoder(TestCase):
+
+    def setUp(self):
+        self.texts = Texts([Text('cat dog'), Text(''), Text('dog bird cat')])
+
+    def test_transform(self):
+        target = k.TokenIdEncoder().fit(self.texts)
+
+        actual = target.transform(self.texts)
+
+        token_ids, offsets = actual.raw()
+        npt.assert_array_equal(token_ids, [0, 1, 1, 2, 0])
+        npt.assert_array_equal(offsets, [0, 2, 2])
+
+    def test_transform_bigrams(self):
+        target = k.TokenIdEncoder(num_buckets=10).fit(self.texts)
+
+        token_ids, offsets = target.transform(
+            Texts([Text('cat unknown dog'), Text('cat dog')])).raw()
+
+        self.assertEqual(target.get_num_of_features(), 13)
+        npt.assert_array_equal(offsets, [0, 2])
+        npt.assert_array_equal(token_ids[:2], [0, 1])
+        self.assertEqual(len(token_ids), 5)
+        self.assertGreaterEqual(token_ids[-1], 3)
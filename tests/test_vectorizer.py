@@ -1,5 +1,8 @@
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
+import numpy as np
+from greentea.text import Text, Texts
+import sklearn.feature_extraction.text as t
 import sklearn.feature_selection as s
 import sklearn.linear_model as li
 import limelight.vectorizer as v
@@ -40,3 +43,60 @@ class TestLogisticRegressionFsVectorizer(TestVectorizer):
             actual.select_from_model.max_features,
             max_features,
             'The third argument constraints the number of the features.')
+
+
+class TestHashedTfidfVectorizer(TestCase):
+
+    def setUp(self):
+        self.documents = ['the cat sat on the mat',
+                          'the dog ate my homework',
+                          'cats and dogs']
+
+    def test_transform(self):
+        target = v.HashedTfidfVectorizer(1 << 20)
+        target.fit(Texts([Text(d) for d in self.documents]))
+
+        actual = target.transform(
+            Texts([Text(d) for d in self.documents])).raw()
+
+        expected = t.TfidfVectorizer().fit_transform(self.documents)
+        np.testing.assert_allclose(np.sort(actual.data),
+                                   np.sort(expected.data),
+                                   rtol=1e-6)
+
+    def test_partial_fit(self):
+        texts = Texts([Text(d) for d in self.documents])
+        fitted = v.HashedTfidfVectorizer(1 << 10).fit(texts)
+        target = v.HashedTfidfVectorizer(1 << 10).fit(texts[:2])
+
+        target.partial_fit(texts[2:])
+
+        self.assertEqual(target.num_of_documents, 3)
+        np.testing.assert_array_equal(target.document_frequency,
+                                      fitted.document_frequency)
+
+    def test_partial_fit_unsupported(self):
+        with self.assertRaises(NotImplementedError):
+            v.TfidfVectorizer().partial_fit(Texts([Text('a')]))
+
+
+class TestTfidfVectorizer(TestCase):
+
+    def test_fit_iterator(self):
+        documents = ['the cat sat', 'the dog sat']
+        target = v.TfidfVectorizer()
+
+        target.fit(Text(d) for d in documents)
+
+        self.assertEqual(sorted(target.vectorizer.vocabulary_),
+                         ['cat', 'dog', 'sat', 'the'])
+
+    def test_fit_transform(self):
+        texts = Texts([Text(d) for d in ['the cat sat', 'the dog sat']])
+        fitted = v.TfidfVectorizer()
+        fitted.fit(texts)
+
+        actual = v.TfidfVectorizer().fit_transform(texts).raw()
+
+        np.testing.assert_array_equal(actual.toarray(),
+                                      fitted.transform(texts).raw().toarray())